@@ -1,22 +1,163 @@
 import streamlit as st
-from graph_workflow import multi_agent_assistant, create_workflow_diagram, ConversationEntry , ConversationStore
-import graphviz
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from graph_workflow import multi_agent_assistant, create_workflow_diagram, ConversationEntry , ConversationStore, state_key, TASK_STAGES, warm_up_bedrock
+import hashlib
 import json
+import math
+import os
+import queue
+import tempfile
+import threading
 from datetime import datetime
-from typing import List, Dict
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Dict
+
+if TYPE_CHECKING:
+    import graphviz
 
 st.title("Multi-Agent Software Development Assistant")
 
-# Initialize conversation store
-conversation_store = ConversationStore()
+HISTORY_PAGE_SIZE = 10
+PIPELINE_MEMO_SIZE = 8
+DIAGRAM_HEIGHT = 600
+SVG_CACHE_DIR = Path("~/.kv_cache/svg").expanduser()
+# DOT sources with more statements than this are laid out in the browser
+CLIENT_RENDER_MIN_STATEMENTS = 200
+
+_CLIENT_RENDER_TEMPLATE = """
+<div id="diagram"></div>
+<script src="https://cdn.jsdelivr.net/npm/@viz-js/viz@3.4.0/lib/viz-standalone.js"></script>
+<script>
+Viz.instance().then(function(viz) {{
+    document.getElementById("diagram").appendChild(viz.renderSVGElement({dot}));
+}});
+</script>
+"""
+
+@st.cache_resource
+def _warm_up():
+    """Start creating the Bedrock client once per process, while the page loads"""
+    return warm_up_bedrock()
+
+_warm_up()
+
+@st.cache_resource
+def get_store() -> ConversationStore:
+    """Return the conversation store shared by every session of this process"""
+    return ConversationStore()
+
+@st.cache_data
+def load_history_cached(mtime: float) -> List[Dict]:
+    """Load history summaries; keyed by file mtime so reruns skip the disk"""
+    return get_store().load_history(fields=ConversationStore.SUMMARY_FIELDS)
 
 def load_conversation_history():
     """Load conversation history from storage"""
-    return conversation_store.load_history()
+    return load_history_cached(os.path.getmtime(get_store().transcript_path))
 
 def save_conversation_history(history: List[Dict]):
     """Save conversation history to storage"""
-    conversation_store.save_history(history)
+    get_store().save_history(history)
+
+def append_conversation_entry(entry: Dict):
+    """Append a single entry to storage without rewriting the history"""
+    get_store().append_entry(entry)
+
+def _render_svg(dot: str, cache_path: Path) -> bytes:
+    """Lay out a DOT string as SVG and persist it to the disk cache"""
+    import graphviz
+    svg = graphviz.Source(dot, engine="dot").pipe(format="svg")
+    SVG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # A unique temp file, so sessions rendering the same diagram don't clobber each other
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(svg)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return svg
+
+def dot_to_svg(dot: str) -> bytes:
+    """Return the SVG for a DOT string, rendering it at most once per unique source"""
+    key = hashlib.blake2b(dot.encode()).hexdigest()
+    cache_path = SVG_CACHE_DIR / f"{key}.svg"
+    if cache_path.exists():
+        return cache_path.read_bytes()
+    return _render_svg(dot, cache_path)
+
+def display_diagram(dot: str):
+    """
+    Display a DOT diagram. Large diagrams are laid out client-side by the
+    WebAssembly build of Graphviz; smaller ones use the cached SVG rendering.
+    """
+    if dot.count("\n") > CLIENT_RENDER_MIN_STATEMENTS:
+        # Escape "</" so labels cannot terminate the script element
+        dot_literal = json.dumps(dot).replace("</", "<\\/")
+        components.html(_CLIENT_RENDER_TEMPLATE.format(dot=dot_literal),
+                        height=DIAGRAM_HEIGHT, scrolling=True)
+        return
+    
+    try:
+        svg = dot_to_svg(dot)
+        components.html(svg.decode(), height=DIAGRAM_HEIGHT, scrolling=True)
+    except Exception as e:
+        st.error(f"Failed to render diagram: {str(e)}")
+
+@st.cache_resource
+def _workflow_dot() -> "graphviz.Digraph":
+    """Build the static workflow diagram once per process"""
+    return create_workflow_diagram()
+
+@st.cache_resource
+def _workflow_svg() -> bytes:
+    """Lay out the static workflow diagram once per process"""
+    return _workflow_dot().pipe(format="svg")
+
+def _history_page_bounds(total: int) -> tuple:
+    """Render the page selector and return the [start, end) slice for it"""
+    total_pages = max(1, math.ceil(total / HISTORY_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+    start = (page - 1) * HISTORY_PAGE_SIZE
+    return start, min(start + HISTORY_PAGE_SIZE, total)
+
+def _toggle_history_entry(entry_id: str):
+    """Open the given history entry, closing any other (or close it if open)"""
+    current = st.session_state.get("open_history_entry")
+    st.session_state.open_history_entry = None if current == entry_id else entry_id
+
+def _display_history_entry(index: int, entry: Dict):
+    """
+    Render one history entry. Only the single open entry loads and renders
+    its diagram, code and explanation; the rest show a short caption.
+    """
+    st.markdown(f"**Question {index + 1}** - {entry['timestamp']}")
+    entry_id = entry['entry_id']
+    is_open = st.session_state.get("open_history_entry") == entry_id
+    st.button("Hide details" if is_open else "Load details",
+              key=f"history_details_{index}",
+              on_click=_toggle_history_entry, args=(entry_id,))
+    if not is_open:
+        st.caption(entry['question'][:80])
+        return
+    
+    st.write("**Question:**")
+    st.write(entry['question'])
+    
+    details = get_store().load_entry(entry_id) or entry
+    if details.get('architecture_diagram'):
+        st.write("**Architecture Diagram:**")
+        display_diagram(details['architecture_diagram'])
+    
+    if details.get('code'):
+        st.write("**Generated Code:**")
+        st.code(details['code'])
+    
+    if details.get('explanation'):
+        st.write("**Explanation:**")
+        st.write(details['explanation'])
 
 def display_conversation_history(history: List[Dict]):
     """Display conversation history in Streamlit"""
@@ -25,55 +166,17 @@ def display_conversation_history(history: List[Dict]):
     # Add clear history button
     if st.button("Clear History"):
         save_conversation_history([])
+        load_history_cached.clear()
         st.session_state.conversation_history = []
+        st.session_state.open_history_entry = None
         st.experimental_rerun()
     
-    for i, entry in enumerate(reversed(history)):  # Show newest first
-        with st.expander(f"Question {len(history)-i} - {entry['timestamp']}", expanded=False):
-            st.write("**Question:**")
-            st.write(entry['question'])
-            
-            if entry.get('architecture_diagram'):
-                st.write("**Architecture Diagram:**")
-                try:
-                    dot = graphviz.Source(entry['architecture_diagram'])
-                    st.graphviz_chart(dot)
-                except Exception as e:
-                    st.error(f"Failed to render diagram: {str(e)}")
-            
-            if entry.get('code'):
-                st.write("**Generated Code:**")
-                st.code(entry['code'])
-            
-            if entry.get('explanation'):
-                st.write("**Explanation:**")
-                st.write(entry['explanation'])
-                
-                
-def display_conversation_history(history: list):
-    """Display conversation history in Streamlit"""
-    st.subheader("Conversation History")
-    
-    for i, entry in enumerate(history):
-        with st.expander(f"Question {i+1} - {entry['timestamp']}", expanded=False):
-            st.write("**Question:**")
-            st.write(entry['question'])
-            
-            if entry.get('architecture_diagram'):
-                st.write("**Architecture Diagram:**")
-                try:
-                    dot = graphviz.Source(entry['architecture_diagram'])
-                    st.graphviz_chart(dot)
-                except Exception as e:
-                    st.error(f"Failed to render diagram: {str(e)}")
-            
-            if entry.get('code'):
-                st.write("**Generated Code:**")
-                st.code(entry['code'])
-            
-            if entry.get('explanation'):
-                st.write("**Explanation:**")
-                st.write(entry['explanation'])
+    # Show newest first, one page at a time
+    start, end = _history_page_bounds(len(history))
+    for offset in range(start, end):
+        index = len(history) - 1 - offset
+        _display_history_entry(index, history[index])
+        st.divider()
 
 def display_results(final_output: dict):
     """Display the results in an organized manner"""
@@ -95,11 +198,7 @@ def display_results(final_output: dict):
                 st.subheader("Architecture Diagram")
                 diagram_code = final_output["architecture"].get("diagram")
                 if diagram_code and isinstance(diagram_code, str):
-                    try:
-                        dot = graphviz.Source(diagram_code)
-                        st.graphviz_chart(dot)
-                    except Exception as e:
-                        st.error(f"Failed to render diagram: {str(e)}")
+                    display_diagram(diagram_code)
     
     with tabs[2]:
         if "implementation" in final_output:
@@ -112,6 +211,110 @@ def display_results(final_output: dict):
                 st.write(final_output["implementation"]["explanation"])
 
 
+# Workflow state shared by every run; per-run and mutable fields are filled in
+_INITIAL_STATE_TEMPLATE = {
+    "current_agent": "supervisor",
+    "architecture_components": None,
+    "architecture_components_json": None,
+    "diagram_code": None,
+    "requirements_analysis": None,
+    "generated_code": None,
+    "code_explanation": None,
+    "final_output": None,
+    "error": None
+}
+
+def _stream_config(on_delta: Callable[[str], None] = None) -> Dict:
+    """Workflow config that streams agent output to on_delta"""
+    return {"configurable": {"on_delta": on_delta}}
+
+def run_pipeline(user_input: str, history: List[Dict],
+                 on_delta: Callable[[str], None] = None) -> Dict:
+    """Run the multi-agent workflow"""
+    initial_state = {
+        **_INITIAL_STATE_TEMPLATE,
+        "user_requirements": user_input,
+        "tasks_completed": [],
+        "conversation_history": history
+    }
+    return multi_agent_assistant.invoke(initial_state, config=_stream_config(on_delta))
+
+def _pipeline_memo() -> Dict:
+    """
+    This session's successful results, keyed by (input text, hash of the
+    history once the result was added), so asking the same question again
+    reuses the answer instead of re-running the pipeline
+    """
+    return st.session_state.setdefault("pipeline_results", {})
+
+def cached_pipeline_result(user_input: str, history: List[Dict]):
+    """Return the memoized result for this input and history, if any"""
+    return _pipeline_memo().get((user_input, state_key(history)))
+
+def remember_pipeline_result(user_input: str, history: List[Dict], result: Dict):
+    """Memoize a successful result, evicting the oldest beyond PIPELINE_MEMO_SIZE"""
+    memo = _pipeline_memo()
+    memo[(user_input, state_key(history))] = result
+    while len(memo) > PIPELINE_MEMO_SIZE:
+        del memo[next(iter(memo))]
+
+def run_streaming(run: Callable[[Callable[[str], None]], Dict]) -> Dict:
+    """
+    Call run(on_delta) on a worker thread and show the streamed text while
+    it works, so the explanation appears token by token instead of at the end
+    """
+    deltas = queue.Queue()
+    outcome = {}
+    
+    def target():
+        try:
+            outcome["result"] = run(deltas.put)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            deltas.put(None)
+    
+    worker = threading.Thread(target=target, daemon=True)
+    add_script_run_ctx(worker)
+    worker.start()
+    placeholder = st.empty()
+    with placeholder.container():
+        st.write_stream(iter(deltas.get, None))
+    worker.join()
+    # The full results are rendered afterwards; drop the live preview
+    placeholder.empty()
+    
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+def rerun_from(result: Dict, task: str, on_delta: Callable[[str], None] = None) -> Dict:
+    """
+    Re-run the workflow from the stage containing task, reusing the outputs
+    of every earlier stage from a previous result instead of regenerating them
+    """
+    completed = []
+    for stage in TASK_STAGES:
+        if task in stage:
+            break
+        completed.extend(stage)
+    state = {
+        **result,
+        "current_agent": "supervisor",
+        "tasks_completed": completed,
+        "next_agents": [],
+        "final_output": None,
+        "error": None
+    }
+    return multi_agent_assistant.invoke(state, config=_stream_config(on_delta))
+
+# Buttons offered under a result, mapped to the first task they re-run
+REGENERATE_ACTIONS = {
+    "Regenerate Code": "coder",
+    "Regenerate Explanation": "explainer"
+}
+
+
 def main():    
      # Initialize session state for conversation history
     if 'conversation_history' not in st.session_state:
@@ -133,52 +336,71 @@ def main():
         
         if st.button("Generate Solution"):
             if user_input:
-                # Create new conversation entry
-                entry = ConversationEntry(
-                    timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    question=user_input
-                )
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 
-                initial_state = {
-                    "user_requirements": user_input,
-                    "current_agent": "supervisor",
-                    "tasks_completed": [],
-                    "architecture_components": None,
-                    "diagram_code": None,
-                    "requirements_analysis": None,
-                    "generated_code": None,
-                    "code_explanation": None,
-                    "final_output": None,
-                    "error": None,
-                    "conversation_history": st.session_state.conversation_history
-                }
+                history = st.session_state.conversation_history
                 
                 with st.spinner("Processing your request..."):
                     try:
-                        result = multi_agent_assistant.invoke(initial_state)
+                        result = cached_pipeline_result(user_input, history)
+                        # A memoized answer is already the latest history entry
+                        is_new = result is None
+                        if is_new:
+                            result = run_streaming(
+                                lambda on_delta: run_pipeline(user_input, history, on_delta)
+                            )
                         st.session_state.result = result
                         
                         if result.get("error"):
                             st.error(result["error"])
+                        elif not is_new:
+                            display_results(result.get("final_output", {}))
                         else:
                             final_output = result.get("final_output", {})
-                                                      # Update conversation entry with results
-                            if "architecture" in final_output:
-                                entry["architecture_diagram"] = final_output["architecture"].get("diagram")
+                            architecture = final_output.get("architecture", {})
+                            implementation = final_output.get("implementation", {})
                             
-                            if "implementation" in final_output:
-                                entry["code"] = final_output["implementation"].get("code")
-                                entry["explanation"] = final_output["implementation"].get("explanation")
+                            # Create new conversation entry with the results
+                            entry = ConversationEntry(
+                                timestamp=timestamp,
+                                question=user_input,
+                                architecture_diagram=architecture.get("diagram"),
+                                code=implementation.get("code"),
+                                explanation=implementation.get("explanation")
+                            )
                             
                             # Update conversation history
-                            st.session_state.conversation_history.append(entry)
-                            save_conversation_history(st.session_state.conversation_history)
+                            entry_dict = entry.to_dict()
+                            append_conversation_entry(entry_dict)
+                            # Session state only keeps summaries; details are read on demand
+                            st.session_state.conversation_history.append(
+                                get_store().summarize(entry_dict)
+                            )
+                            remember_pipeline_result(user_input, st.session_state.conversation_history, result)
                             display_results(final_output)
                             
                     except Exception as e:
                         st.error(f"An error occurred: {str(e)}")
             else:
                 st.error("Please enter your requirements first.")
+        
+        previous = st.session_state.get("result")
+        if previous and not previous.get("error"):
+            for column, (label, task) in zip(st.columns(len(REGENERATE_ACTIONS)),
+                                             REGENERATE_ACTIONS.items()):
+                if column.button(label):
+                    with st.spinner("Processing your request..."):
+                        try:
+                            result = run_streaming(
+                                lambda on_delta: rerun_from(previous, task, on_delta)
+                            )
+                            st.session_state.result = result
+                            if result.get("error"):
+                                st.error(result["error"])
+                            else:
+                                display_results(result.get("final_output", {}))
+                        except Exception as e:
+                            st.error(f"An error occurred: {str(e)}")
     
     with history_tab:
         display_conversation_history(st.session_state.conversation_history)
@@ -190,21 +412,20 @@ def main():
     
     with workflow_tab:
         st.subheader("Workflow Diagram")
-        workflow_dot = create_workflow_diagram()
-        st.graphviz_chart(workflow_dot)
+        components.html(_workflow_svg().decode(), height=DIAGRAM_HEIGHT)
         
         st.markdown("""
         ### Workflow Steps
         1. **Supervisor Agent**: Orchestrates the entire workflow
         2. **Requirements Analyzer**: Breaks down user requirements
-        3. **Architecture Designer**: Creates system architecture
+        3. **Architecture Designer**: Creates system architecture (in parallel with the analyzer)
         4. **Code Generator**: Implements the solution
         5. **Code Explainer**: Documents the implementation
         6. **Output Consolidator**: Combines all outputs
         
         ### Agent Interactions
         - Each agent reports back to the supervisor
-        - Supervisor determines the next step
+        - Supervisor determines the next step, dispatching independent agents in parallel
         - Results are accumulated throughout the process
         """)
 
@@ -1,11 +1,17 @@
 
 import boto3
-import json
+import orjson
+import time
+from pathlib import Path
+from botocore.config import Config
 
 # AWS Clients
 dynamodb = boto3.resource('dynamodb')
 gamelift = boto3.client('gamelift')
-cognito = boto3.client('cognito-idp')
+cognito = boto3.client(
+    'cognito-idp',
+    config=Config(max_pool_connections=10, retries={'max_attempts': 2})
+)
 api_gateway = boto3.client('apigateway')
 
 # DynamoDB Table
@@ -25,17 +31,28 @@ build_id = 'YOUR_BUILD_ID'
 fleet_id = 'YOUR_FLEET_ID'
 alias_id = 'YOUR_ALIAS_ID'
 
+# Cognito user cache (survives across warm Lambda invocations)
+USER_CACHE_TTL_SECONDS = 60
+_USER_CACHE = {}
+
 # Helper Functions
 def get_user(username):
+    cached = _USER_CACHE.get(username)
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+
     try:
         response = cognito.admin_get_user(
             UserPoolId=user_pool_id,
             Username=username
         )
-        return response['UserAttributes']
     except cognito.exceptions.UserNotFoundException:
         return None
 
+    attributes = response['UserAttributes']
+    _USER_CACHE[username] = (attributes, time.monotonic() + USER_CACHE_TTL_SECONDS)
+    return attributes
+
 def create_game_session(user_data):
     try:
         response = gamelift.create_game_session(
@@ -79,23 +96,24 @@ def lambda_handler(event, context):
         game_session = create_game_session(user_data)
 
         if game_session:
-            # Save game data to DynamoDB
+            # Save game data to DynamoDB; it needs the session, so it can't
+            # overlap the GameLift call
             save_game_data(game_session, user_data)
 
             # Return game session data
             return {
                 'statusCode': 200,
-                'body': json.dumps(game_session)
+                'body': orjson.dumps(game_session, option=orjson.OPT_NAIVE_UTC).decode()
             }
         else:
             return {
                 'statusCode': 500,
-                'body': json.dumps({'error': 'Failed to create game session'})
+                'body': orjson.dumps({'error': 'Failed to create game session'}).decode()
             }
     else:
         return {
             'statusCode': 401,
-            'body': json.dumps({'error': 'Unauthorized'})
+            'body': orjson.dumps({'error': 'Unauthorized'}).decode()
         }
 
 # Deploy Lambda Function
@@ -103,6 +121,9 @@ lambda_client = boto3.client('lambda')
 lambda_function_name = 'YOUR_LAMBDA_FUNCTION_NAME'
 lambda_role_arn = 'YOUR_LAMBDA_ROLE_ARN'
 
+# Read the deployment package once for both the create and update paths
+zip_bytes = Path('lambda_function.py').read_bytes()
+
 try:
     lambda_client.create_function(
         FunctionName=lambda_function_name,
@@ -110,30 +131,44 @@ try:
         Role=lambda_role_arn,
         Handler='lambda_function.lambda_handler',
         Code={
-            'ZipFile': open('lambda_function.py', 'rb').read()
+            'ZipFile': zip_bytes
         }
     )
 except lambda_client.exceptions.ResourceConflictException:
     lambda_client.update_function_code(
         FunctionName=lambda_function_name,
-        ZipFile=open('lambda_function.py', 'rb').read()
+        ZipFile=zip_bytes
     )
 
-# Create API Gateway Integration
-api_gateway.put_integration(
-    RestApiId=rest_api_id,
-    ResourceId=resource_id,
-    HttpMethod=http_method,
-    Type='AWS_PROXY',
-    IntegrationHttpMethod='POST',
-    Uri='arn:aws:apigateway:YOUR_REGION:lambda:path/2015-03-31/functions/arn:aws:lambda:YOUR_REGION:YOUR_ACCOUNT_ID:function:' + lambda_function_name + '/invocations'
-)
+integration_uri = 'arn:aws:apigateway:YOUR_REGION:lambda:path/2015-03-31/functions/arn:aws:lambda:YOUR_REGION:YOUR_ACCOUNT_ID:function:' + lambda_function_name + '/invocations'
 
-# Deploy API Gateway
-api_gateway.create_deployment(
-    RestApiId=rest_api_id,
-    StageName='prod'
-)
+# Skip the integration update and redeploy if the API already points at this function
+try:
+    existing_integration = api_gateway.get_integration(
+        RestApiId=rest_api_id,
+        ResourceId=resource_id,
+        HttpMethod=http_method
+    )
+    integration_changed = existing_integration.get('uri') != integration_uri
+except api_gateway.exceptions.NotFoundException:
+    integration_changed = True
+
+if integration_changed:
+    # Create API Gateway Integration
+    api_gateway.put_integration(
+        RestApiId=rest_api_id,
+        ResourceId=resource_id,
+        HttpMethod=http_method,
+        Type='AWS_PROXY',
+        IntegrationHttpMethod='POST',
+        Uri=integration_uri
+    )
+
+    # Deploy API Gateway
+    api_gateway.create_deployment(
+        RestApiId=rest_api_id,
+        StageName='prod'
+    )
 
 """
 This code demonstrates how to use AWS services like GameLift, DynamoDB, API Gateway, and Cognito to create a game session and store game data. Here's a breakdown of the code:
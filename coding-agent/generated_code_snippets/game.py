@@ -1,8 +1,8 @@
 
 # Imports
 import pygame
-import random
-import math
+from functools import lru_cache
+import numpy as np
 import aws_gamelift
 
 # Constants
@@ -32,22 +32,18 @@ ENEMY_ATTACK_DAMAGE = 20
 GAME_RUNNING = True
 GAME_OVER = False
 
-# Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Post-Apocalyptic India")
-clock = pygame.time.Clock()
-
-# Load assets
-player_image = pygame.image.load("player.png")
-enemy_image = pygame.image.load("enemy.png")
-background_image = pygame.image.load("background.png")
+# Load assets (decoded on first use, after the display is set up)
+@lru_cache(maxsize=None)
+def load_image(name, alpha=True):
+    # Convert to the display pixel format once so blits don't convert per frame
+    image = pygame.image.load(name)
+    return image.convert_alpha() if alpha else image.convert()
 
 # Game classes
 class Player(pygame.sprite.Sprite):
-    def __init__(self):
+    def __init__(self, image=None):
         super().__init__()
-        self.image = player_image
+        self.image = image if image is not None else load_image("player.png")
         self.rect = self.image.get_rect()
         self.rect.x = SCREEN_WIDTH // 2
         self.rect.y = SCREEN_HEIGHT // 2
@@ -69,24 +65,29 @@ class Player(pygame.sprite.Sprite):
     def attack(self, target):
         target.health -= self.attack_damage
 
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self):
-        super().__init__()
-        self.image = enemy_image
-        self.rect = self.image.get_rect()
-        self.rect.x = random.randint(0, SCREEN_WIDTH - self.rect.width)
-        self.rect.y = random.randint(0, SCREEN_HEIGHT - self.rect.height)
-        self.health = ENEMY_HEALTH
+# Enemies are stored as NumPy arrays (one row per enemy) and updated in one pass
+class EnemySwarm:
+    def __init__(self, count, image=None):
+        self.image = image if image is not None else load_image("enemy.png")
+        width, height = self.image.get_size()
+        self.half_w = width / 2
+        self.half_h = height / 2
+        self.pos = np.random.rand(count, 2) * [SCREEN_WIDTH - width, SCREEN_HEIGHT - height]
+        self.health = np.full(count, ENEMY_HEALTH)
         self.attack_damage = ENEMY_ATTACK_DAMAGE
         self.speed = ENEMY_SPEED
 
-    def update(self):
-        dx = player.rect.x - self.rect.x
-        dy = player.rect.y - self.rect.y
-        dist = math.hypot(dx, dy)
-        if dist > 0:
-            self.rect.x += self.speed * dx / dist
-            self.rect.y += self.speed * dy / dist
+    def update(self, px, py):
+        # Move every enemy one step towards the player
+        d = np.array([px, py]) - self.pos
+        r = np.linalg.norm(d, axis=1, keepdims=True)
+        self.pos += self.speed * d / np.where(r > 0, r, 1)
+
+    def colliding(self, rect):
+        # Axis-aligned bounding box overlap between each enemy and rect
+        centers = self.pos + [self.half_w, self.half_h]
+        return ((np.abs(centers[:, 0] - rect.centerx) < self.half_w + rect.width / 2) &
+                (np.abs(centers[:, 1] - rect.centery) < self.half_h + rect.height / 2))
 
     def attack(self, target):
         target.health -= self.attack_damage
@@ -105,48 +106,52 @@ def draw_health_bar(x, y, health, max_health):
     pygame.draw.rect(screen, GREEN, fill_rect)
     pygame.draw.rect(screen, WHITE, outline_rect, 2)
 
-# Game loop
-player = Player()
-enemies = pygame.sprite.Group()
-for i in range(10):
-    enemy = Enemy()
-    enemies.add(enemy)
-
-while GAME_RUNNING:
-    clock.tick(FPS)
-
-    # Event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            GAME_RUNNING = False
-
-    # Update game objects
-    player.update()
-    enemies.update()
-
-    # Check for collisions
-    hits = pygame.sprite.spritecollide(player, enemies, False)
-    for hit in hits:
-        player.health -= hit.attack_damage
+if __name__ == "__main__":
+    # Initialize Pygame
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Post-Apocalyptic India")
+    clock = pygame.time.Clock()
+    background_image = load_image("background.png", alpha=False)
+
+    # Game loop
+    player = Player()
+    enemies = EnemySwarm(10)
+
+    while GAME_RUNNING:
+        clock.tick(FPS)
+
+        # Event handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                GAME_RUNNING = False
+
+        # Update game objects
+        player.update()
+        enemies.update(player.rect.x, player.rect.y)
+
+        # Check for collisions
+        hits = enemies.colliding(player.rect)
+        player.health -= ENEMY_ATTACK_DAMAGE * int(hits.sum())
         if player.health <= 0:
             GAME_OVER = True
 
-    # Draw game objects
-    screen.blit(background_image, (0, 0))
-    screen.blit(player.image, player.rect)
-    for enemy in enemies:
-        screen.blit(enemy.image, enemy.rect)
+        # Draw game objects
+        screen.blit(background_image, (0, 0))
+        sprites = [(player.image, player.rect)]
+        sprites.extend((enemies.image, (x, y)) for x, y in enemies.pos)
+        screen.blits(sprites, doreturn=False)
 
-    # Draw health bars
-    draw_health_bar(10, 10, player.health, PLAYER_HEALTH)
-    for enemy in enemies:
-        draw_health_bar(enemy.rect.x, enemy.rect.y - 20, enemy.health, ENEMY_HEALTH)
+        # Draw health bars
+        draw_health_bar(10, 10, player.health, PLAYER_HEALTH)
+        for (x, y), health in zip(enemies.pos, enemies.health):
+            draw_health_bar(x, y - 20, health, ENEMY_HEALTH)
 
-    # Update display
-    pygame.display.flip()
+        # Update display
+        pygame.display.flip()
 
-# Quit Pygame
-pygame.quit()
+    # Quit Pygame
+    pygame.quit()
 
 """
 This code provides a basic implementation of a multiplayer game like Minecraft, set in a post-apocalyptic world in India. It includes a player character, enemies, and basic movement and combat mechanics. The game is designed to be deployed on AWS GameLift, a serverless game hosting service.
@@ -1,82 +1,473 @@
 import json
-import boto3
-from typing import TypedDict, Dict, List, Optional
+import operator
+from typing import TYPE_CHECKING, Annotated, Callable, TypedDict, Dict, List, Optional, Tuple
 from langgraph.graph import StateGraph, END
 import logging
 from datetime import datetime
-import graphviz
 from dataclasses import dataclass, asdict
 import os
+import re
+import sqlite3
+import string
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import base64
-from botocore.exceptions import ClientError 
-import pdb
+import mmap
+import atexit
+import fcntl
+import hashlib
+import inspect
+import itertools
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from types import MappingProxyType
+from contextlib import contextmanager
+from botocore.config import Config
+from botocore.exceptions import ClientError, EventStreamError
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import json_repair
+except ImportError:  # Almost-valid JSON responses are then dropped
+    json_repair = None
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a characters-per-token estimate
+    tiktoken = None
+
+try:
+    import xxhash
+except ImportError:  # Fall back to hashlib's blake2b
+    xxhash = None
+
+if TYPE_CHECKING:
+    import graphviz
 
 MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"#"amazon.nova-pro-v1:0" #"anthropic.claude-3-sonnet-20240229-v1:0"
+# Faster, cheaper model for summarization-style steps (requirements analysis, explanations)
+FAST_MODEL_ID = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
 TRUNCATE_TOKENS = 1000
-# Set up logging
-logging.basicConfig(level=logging.INFO,
-                   format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s()-%(message)s')
+# Token budget of the model's context window; prompts are cut to fit what is
+# left after the system prompt and the response
+MODEL_CONTEXT_TOKENS = 200000
+SYSTEM_RESERVE_TOKENS = 500
+# Set up logging, unless the host application (e.g. Streamlit) already has
+# handlers; Streamlit re-executes imports on reruns
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.WARNING,
+                       format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s()-%(message)s')
 logger = logging.getLogger(__name__)
 
-# Bedrock client setup
-bedrock_runtime = boto3.client(
-    service_name='bedrock-runtime',
-    region_name='us-east-1'
+# Bedrock client setup. Clients are thread-safe and shared by parallel agents,
+# so size the pool for concurrent calls and keep connections alive.
+BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 3},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=120
 )
 
-bedrock_agent_runtime = boto3.client(
-    service_name='bedrock-agent-runtime',
-    region_name='us-east-1'
-)
+# Clients are created on first use so importing this module (e.g. only to
+# build the workflow graph) doesn't pay for boto3 and the TLS handshake
+_bedrock_clients: Dict[str, object] = {}
+_bedrock_clients_lock = threading.Lock()
+
+def _bedrock_client(service_name: str):
+    """Return the shared client for a Bedrock service, creating it once"""
+    client = _bedrock_clients.get(service_name)
+    if client is None:
+        with _bedrock_clients_lock:
+            client = _bedrock_clients.get(service_name)
+            if client is None:
+                import boto3
+                client = boto3.client(
+                    service_name=service_name,
+                    region_name='us-east-1',
+                    config=BEDROCK_CLIENT_CONFIG
+                )
+                _bedrock_clients[service_name] = client
+    return client
+
+def bedrock_runtime():
+    return _bedrock_client('bedrock-runtime')
+
+def warm_up_bedrock() -> threading.Thread:
+    """
+    Create the Bedrock runtime client on a background thread, so an app can
+    pay for boto3, credential resolution and endpoint setup before the first
+    request instead of during it
+    """
+    thread = threading.Thread(target=bedrock_runtime, name="bedrock-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def bedrock_agent_runtime():
+    return _bedrock_client('bedrock-agent-runtime')
+
+def _json_dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def _json_loads(data):
+    """Deserialize JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps_indented(obj) -> str:
+    """Serialize to two-space indented JSON text for prompts"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+def state_key(obj) -> str:
+    """
+    Stable content hash of a JSON-serializable object. Keys are sorted so the
+    fingerprint does not depend on dict insertion order.
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    else:
+        data = json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+    if xxhash is not None:
+        return xxhash.xxh3_128(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+# Markdown code fences models often wrap JSON in
+_CODE_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*$', re.MULTILINE)
+
+def loads_model_json(text: str):
+    """
+    Decode JSON emitted by a model: strip code fences, decode directly, pick
+    the object out of surrounding prose, and repair almost-valid JSON before
+    giving up
+    """
+    text = _CODE_FENCE_RE.sub('', text)
+    try:
+        return _json_loads(text)
+    except ValueError:
+        embedded = extract_json_object(text)
+        if embedded is not None:
+            return embedded
+        if json_repair is None:
+            raise
+        logger.info("Model output is not valid JSON, attempting repair")
+        return json_repair.loads(text)
+
+# Average characters per token used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# The encoding is loaded on first truncation: tiktoken downloads its BPE file
+# on first use, which must not happen at import time or break it when offline
+_UNLOADED = object()
+_tokenizer = _UNLOADED
+_tokenizer_lock = threading.Lock()
+
+def _get_tokenizer():
+    """Return the shared tokenizer, or None if it cannot be loaded"""
+    global _tokenizer
+    if _tokenizer is _UNLOADED:
+        with _tokenizer_lock:
+            if _tokenizer is _UNLOADED:
+                encoding = None
+                if tiktoken is not None:
+                    try:
+                        # Not Claude's tokenizer, but a close enough count for budgeting
+                        encoding = tiktoken.get_encoding("cl100k_base")
+                    except Exception as e:
+                        logger.warning(f"Tokenizer unavailable, estimating tokens from characters: {e}")
+                _tokenizer = encoding
+    return _tokenizer
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens tokens"""
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = tokenizer.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return tokenizer.decode(tokens[:max_tokens])
+
+def _read_response_body(body, chunk_size: int = 8192) -> bytearray:
+    """Read a botocore StreamingBody chunk by chunk into a single buffer"""
+    buffer = bytearray()
+    for chunk in body.iter_chunks(chunk_size=chunk_size):
+        buffer += chunk
+    return buffer
+
+def _encode_entry(entry: Dict) -> bytes:
+    """Serialize a history entry to a single compact JSONL line"""
+    return _json_dumps(entry) + b"\n"
 
 class ConversationStore:
-    def __init__(self, storage_path: str = "conversation_history.json"):
+    """
+    Conversation history split into a small JSON index (byte offset of each
+    entry, last timestamp) and an append-only JSONL transcript with one entry
+    per line, so adding an entry never rewrites the existing history and a
+    single entry can be read back without scanning the transcript.
+
+    Writes are serialized across processes/sessions with an exclusive
+    ``fcntl.flock`` on a sidecar lock file. Large text fields are kept in a
+    content-addressed blob directory and the transcript only stores their
+    hashes, so repeated code/explanations are stored once.
+
+    With a non-zero `flush_interval`, appended entries are buffered and
+    written as one batch once the interval has elapsed (or on flush(),
+    any read, or interpreter exit).
+    """
+
+    LOCK_TIMEOUT = 10.0
+    SUMMARY_FIELDS = ("entry_id", "timestamp", "question")
+    BLOB_FIELDS = ("code", "explanation")
+
+    def __init__(self, storage_path: str = "conversation_history.json",
+                 flush_interval: float = 0.0):
         self.storage_path = storage_path
+        self.transcript_path = os.path.splitext(storage_path)[0] + ".jsonl"
+        self.lock_path = storage_path + ".lock"
+        self.flush_interval = flush_interval
+        self._pending: List[Dict] = []
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        if flush_interval > 0:
+            atexit.register(self.flush)
+        self.blob_dir = Path(os.path.splitext(storage_path)[0] + "_blobs")
         self._ensure_storage_exists()
     
+    @staticmethod
+    def entry_id(entry: Dict) -> str:
+        """Stable id of an entry, derived from its timestamp and question"""
+        key = f"{entry.get('timestamp')}\0{entry.get('question')}"
+        return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    
+    def summarize(self, entry: Dict) -> Dict:
+        """Reduce an entry to SUMMARY_FIELDS"""
+        entry = {**entry, "entry_id": self.entry_id(entry)}
+        return {key: entry.get(key) for key in self.SUMMARY_FIELDS}
+    
+    def put_blob(self, text: str) -> str:
+        """Store text under its content hash and return the hash"""
+        ref = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        path = self.blob_dir / ref
+        if not path.exists():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(text)
+            os.replace(tmp_path, path)
+        return ref
+    
+    def get_blob(self, ref: str) -> Optional[str]:
+        """Read text previously stored with put_blob"""
+        try:
+            return (self.blob_dir / ref).read_text()
+        except OSError as e:
+            logger.error(f"Error loading blob {ref}: {e}")
+            return None
+    
+    def _externalize(self, entry: Dict) -> Dict:
+        """Replace large text fields with references into the blob store"""
+        entry = dict(entry)
+        for field in self.BLOB_FIELDS:
+            value = entry.get(field)
+            if isinstance(value, str):
+                entry[f"{field}_ref"] = self.put_blob(value)
+                del entry[field]
+        return entry
+    
+    def _resolve(self, entry: Dict) -> Dict:
+        """Dereference blob references written by _externalize"""
+        for field in self.BLOB_FIELDS:
+            ref = entry.pop(f"{field}_ref", None)
+            if ref is not None:
+                entry[field] = self.get_blob(ref)
+        return entry
+    
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock on the store, giving up after LOCK_TIMEOUT seconds"""
+        # Streamlit runs scripts off the main thread, so signal.alarm is not
+        # usable here; poll a non-blocking lock against a deadline instead.
+        with open(self.lock_path, 'a+') as lock_file:
+            deadline = time.monotonic() + self.LOCK_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Timed out waiting for lock on {self.lock_path}")
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
     def _ensure_storage_exists(self):
-        """Create storage file if it doesn't exist"""
-        if not os.path.exists(self.storage_path):
-            with open(self.storage_path, 'w') as f:
-                json.dump([], f)
+        """Create storage files if they don't exist, migrating a legacy JSON array"""
+        legacy_history = None
+        if os.path.exists(self.storage_path):
+            try:
+                with open(self.storage_path, 'rb') as f:
+                    data = _json_loads(f.read())
+                if isinstance(data, list):
+                    legacy_history = data
+            except Exception as e:
+                logger.error(f"Error reading conversation index: {e}")
+        
+        if legacy_history is not None:
+            self.save_history(legacy_history)
+        elif not os.path.exists(self.transcript_path):
+            self.save_history([])
+        else:
+            # Indexes written before entry ids were recorded are rebuilt once
+            metadata = self.load_metadata()
+            if len(metadata.get("ids", [])) != len(metadata.get("offsets", [])):
+                self.save_history(self.load_history())
+    
+    def _write_metadata(self, offsets: List[int], ids: List[str], last_timestamp: Optional[str]):
+        """Atomically replace the metadata index"""
+        tmp_path = self.storage_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_json_dumps({
+                "count": len(offsets),
+                "last_timestamp": last_timestamp,
+                "offsets": offsets,
+                "ids": ids
+            }))
+        os.replace(tmp_path, self.storage_path)
+    
+    def load_metadata(self) -> Dict:
+        """Load the metadata index"""
+        try:
+            with open(self.storage_path, 'rb') as f:
+                return _json_loads(f.read())
+        except Exception as e:
+            logger.error(f"Error loading conversation index: {e}")
+            return {"count": 0, "last_timestamp": None, "offsets": [], "ids": []}
     
-    def load_history(self) -> List[Dict]:
+    def iter_history(self, fields: Optional[tuple] = None):
+        """
+        Yield conversation entries one line at a time, so only a single full
+        entry is held in memory. If `fields` is given, each entry is reduced
+        to those keys before being yielded.
+        """
+        self.flush()
+        with open(self.transcript_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = _json_loads(line)
+                if fields is not None:
+                    entry["entry_id"] = self.entry_id(entry)
+                    yield {key: entry.get(key) for key in fields}
+                else:
+                    yield self._resolve(entry)
+    
+    def load_entry(self, entry_id: str) -> Optional[Dict]:
+        """Load a single entry by its entry_id, seeking to its recorded byte offset"""
+        self.flush()
+        metadata = self.load_metadata()
+        offsets = metadata.get("offsets", [])
+        ids = metadata.get("ids", [])
+        try:
+            if entry_id not in ids:
+                return None
+            with open(self.transcript_path, 'rb') as f:
+                f.seek(offsets[ids.index(entry_id)])
+                return self._resolve(_json_loads(f.readline()))
+        except Exception as e:
+            logger.error(f"Error loading conversation entry {entry_id}: {e}")
+            return None
+    
+    def load_history(self, fields: Optional[tuple] = None) -> List[Dict]:
         """Load conversation history from storage"""
         try:
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
+            return list(self.iter_history(fields))
         except Exception as e:
             logger.error(f"Error loading conversation history: {e}")
             return []
     
+    def append_entries(self, entries: List[Dict]):
+        """Append entries to the transcript in one write and update the index once"""
+        if not entries:
+            return
+        try:
+            with self._locked():
+                new_offsets = []
+                new_ids = []
+                lines = []
+                with open(self.transcript_path, 'ab') as f:
+                    offset = f.tell()
+                    for entry in entries:
+                        line = _encode_entry(self._externalize(entry))
+                        new_offsets.append(offset)
+                        new_ids.append(self.entry_id(entry))
+                        lines.append(line)
+                        offset += len(line)
+                    f.write(b"".join(lines))
+                metadata = self.load_metadata()
+                offsets = metadata.get("offsets", []) + new_offsets
+                ids = metadata.get("ids", []) + new_ids
+                self._write_metadata(offsets, ids, entries[-1].get('timestamp'))
+        except Exception as e:
+            logger.error(f"Error saving conversation entries: {e}")
+    
+    def append_entry(self, entry: Dict):
+        """Append a single entry, batching it with others if a flush interval is set"""
+        with self._pending_lock:
+            self._pending.append(entry)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+    
+    def flush(self):
+        """Write any buffered entries"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        self.append_entries(pending)
+    
     def save_history(self, history: List[Dict]):
-        """Save conversation history to storage"""
+        """Rewrite the whole conversation history (used for clearing/migration)"""
+        with self._pending_lock:
+            self._pending = []
         try:
-            with open(self.storage_path, 'w') as f:
-                json.dump(history, f, indent=2)
+            with self._locked():
+                tmp_path = self.transcript_path + ".tmp"
+                offsets = []
+                ids = []
+                with open(tmp_path, 'wb') as f:
+                    for entry in history:
+                        offsets.append(f.tell())
+                        ids.append(self.entry_id(entry))
+                        f.write(_encode_entry(self._externalize(entry)))
+                os.replace(tmp_path, self.transcript_path)
+                last_timestamp = history[-1].get('timestamp') if history else None
+                self._write_metadata(offsets, ids, last_timestamp)
         except Exception as e:
             logger.error(f"Error saving conversation history: {e}")
 
+@dataclass(slots=True, frozen=True)
 class ConversationEntry:
-    def __init__(self, timestamp: str, question: str, 
-                 architecture_diagram: Optional[str] = None,
-                 code: Optional[str] = None, 
-                 explanation: Optional[str] = None):
-        self.timestamp = timestamp
-        self.question = question
-        self.architecture_diagram = architecture_diagram
-        self.code = code
-        self.explanation = explanation
+    timestamp: str
+    question: str
+    architecture_diagram: Optional[str] = None
+    code: Optional[str] = None
+    explanation: Optional[str] = None
     
     def to_dict(self) -> Dict:
-        return {
-            'timestamp': self.timestamp,
-            'question': self.question,
-            'architecture_diagram': self.architecture_diagram,
-            'code': self.code,
-            'explanation': self.explanation
-        }
+        return asdict(self)
     
     @classmethod
     def from_dict(cls, data: Dict):
@@ -88,129 +479,289 @@ class ConversationEntry:
             explanation=data.get('explanation')
         )
 
+def _last_value(current, update):
+    """Reducer that keeps the most recent write (parallel nodes may both write)"""
+    return update
+
 class WorkflowState(TypedDict):
     user_requirements: str
-    current_agent: str
-    tasks_completed: List[str]
+    current_agent: Annotated[str, _last_value]
+    # Agents return only the tasks they completed; parallel results are concatenated
+    tasks_completed: Annotated[List[str], operator.add]
+    next_agents: List[str]
     architecture_components: Dict | None
+    # Prompt-ready JSON of architecture_components (minus rendered diagram
+    # files), set together with it
+    architecture_components_json: str | None
     diagram_code: str | None
     requirements_analysis: str | None
     generated_code: str | None
     code_explanation: str | None
     final_output: Dict | None
     error: str | None
-    conversation_history: List[ConversationEntry]
+    # Nodes return only new entries, never the full history plus the new one
+    conversation_history: Annotated[List[ConversationEntry], operator.add]
 
 
-class InlineAgentActions:
-    """Define common action groups for inline agents"""
-    
-    @staticmethod
-    def get_architecture_actions() -> List[Dict]:
-        return [{
-            "actionGroupName": "ArchitectureActions",
-            "actionGroupExecutor": "AWS_LAMBDA",
-            "apiSchema": {
-                "openapi": "3.0.0",
-                "info": {
-                    "title": "Architecture Design API",
-                    "version": "1.0.0"
-                },
-                "paths": {
-                    "/generate-architecture": {
-                        "post": {
-                            "operationId": "GenerateArchitecture",
-                            "summary": "Generate AWS architecture diagram",
-                            "requestBody": {
-                                "required": True,
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "requirements": {
-                                                    "type": "string",
-                                                    "description": "User requirements"
-                                                },
-                                                "services": {
-                                                    "type": "array",
-                                                    "items": {
-                                                        "type": "string"
-                                                    },
-                                                    "description": "AWS services to include"
-                                                }
+# Rendered diagram artifacts are useless to the model as text and can be
+# megabytes of base64, so they are left out of prompts
+_PROMPT_EXCLUDED_ARCHITECTURE_KEYS = frozenset(('diagram_base64', 'diagram_files'))
+
+def _architecture_prompt_json(components: Dict) -> str:
+    """Serialize the components for prompts, without rendered diagram artifacts"""
+    return _json_dumps_indented({
+        key: value for key, value in components.items()
+        if key not in _PROMPT_EXCLUDED_ARCHITECTURE_KEYS
+    })
+
+def architecture_update(components: Dict) -> Dict:
+    """State update that stores the components along with their serialized JSON"""
+    return {
+        "architecture_components": components,
+        "architecture_components_json": _architecture_prompt_json(components)
+    }
+
+def architecture_json(state: WorkflowState) -> str:
+    """Return the architecture JSON for prompts, serializing only if not cached"""
+    cached = state.get('architecture_components_json')
+    if cached is not None:
+        return cached
+    return _architecture_prompt_json(state.get('architecture_components') or {})
+
+def _freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Static OpenAPI action groups, frozen once; the prompt JSON is precomputed too
+_ARCHITECTURE_ACTIONS_SPEC = [{
+    "actionGroupName": "ArchitectureActions",
+    "actionGroupExecutor": "AWS_LAMBDA",
+    "apiSchema": {
+        "openapi": "3.0.0",
+        "info": {
+            "title": "Architecture Design API",
+            "version": "1.0.0"
+        },
+        "paths": {
+            "/generate-architecture": {
+                "post": {
+                    "operationId": "GenerateArchitecture",
+                    "summary": "Generate AWS architecture diagram",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "requirements": {
+                                            "type": "string",
+                                            "description": "User requirements"
+                                        },
+                                        "services": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "string"
                                             },
-                                            "required": ["requirements"]
+                                            "description": "AWS services to include"
                                         }
-                                    }
+                                    },
+                                    "required": ["requirements"]
                                 }
                             }
                         }
                     }
                 }
             }
-        }]
-    
-    @staticmethod
-    def get_code_actions() -> List[Dict]:
-        return [{
-            "actionGroupName": "CodeActions",
-            "actionGroupExecutor": "AWS_LAMBDA",
-            "apiSchema": {
-                "openapi": "3.0.0",
-                "info": {
-                    "title": "Code Generation API",
-                    "version": "1.0.0"
-                },
-                "paths": {
-                    "/generate-code": {
-                        "post": {
-                            "operationId": "GenerateCode",
-                            "summary": "Generate implementation code",
-                            "requestBody": {
-                                "required": True,
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
+        }
+    }
+}]
+
+_CODE_ACTIONS_SPEC = [{
+    "actionGroupName": "CodeActions",
+    "actionGroupExecutor": "AWS_LAMBDA",
+    "apiSchema": {
+        "openapi": "3.0.0",
+        "info": {
+            "title": "Code Generation API",
+            "version": "1.0.0"
+        },
+        "paths": {
+            "/generate-code": {
+                "post": {
+                    "operationId": "GenerateCode",
+                    "summary": "Generate implementation code",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "architecture": {
                                             "type": "object",
-                                            "properties": {
-                                                "architecture": {
-                                                    "type": "object",
-                                                    "description": "Architecture components"
-                                                },
-                                                "language": {
-                                                    "type": "string",
-                                                    "description": "Programming language"
-                                                }
-                                            },
-                                            "required": ["architecture"]
+                                            "description": "Architecture components"
+                                        },
+                                        "language": {
+                                            "type": "string",
+                                            "description": "Programming language"
                                         }
-                                    }
+                                    },
+                                    "required": ["architecture"]
                                 }
                             }
                         }
                     }
                 }
             }
-        }]
+        }
+    }
+}]
+
+_ARCHITECTURE_ACTIONS_JSON = _json_dumps_indented(_ARCHITECTURE_ACTIONS_SPEC)
+_CODE_ACTIONS_JSON = _json_dumps_indented(_CODE_ACTIONS_SPEC)
+_ARCHITECTURE_ACTIONS = _freeze(_ARCHITECTURE_ACTIONS_SPEC)
+_CODE_ACTIONS = _freeze(_CODE_ACTIONS_SPEC)
+del _ARCHITECTURE_ACTIONS_SPEC, _CODE_ACTIONS_SPEC
+
+class InlineAgentActions:
+    """Define common action groups for inline agents"""
+    
+    @staticmethod
+    def get_architecture_actions() -> Tuple[MappingProxyType, ...]:
+        return _ARCHITECTURE_ACTIONS
+    
+    @staticmethod
+    def get_code_actions() -> Tuple[MappingProxyType, ...]:
+        return _CODE_ACTIONS
+
+
+# LRU cache of Bedrock responses keyed by the state_key of the model id and
+# request body, with entries expiring after a TTL. Shared by InlineAgent and
+# invoke_claude; guarded because agents can run in parallel.
+BEDROCK_CACHE_SIZE = 512
+BEDROCK_CACHE_TTL_SECONDS = 3600
+# Sampling above this temperature is too varied for cached responses to be reused
+CACHEABLE_MAX_TEMPERATURE = 0.3
+# Temperature of stages whose structured output should be reproducible (and
+# therefore cacheable): architecture components and generated code
+DETERMINISTIC_TEMPERATURE = 0.0
+_bedrock_response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_bedrock_cache_lock = threading.Lock()
+
+# Second, on-disk tier so responses survive restarts and are shared between
+# processes (e.g. Streamlit sessions). It backs the same cacheable calls as
+# the memory tier (the DETERMINISTIC_TEMPERATURE stages and deterministic
+# InlineAgent calls) and is opened on the first lookup, not at import;
+# expired rows are purged then
+RESPONSE_DB_PATH = Path(os.getenv("KV_RESPONSE_CACHE", "~/.kv_cache/responses.sqlite3")).expanduser()
+RESPONSE_DB_TTL_SECONDS = 24 * 3600
+_response_db: Optional[sqlite3.Connection] = None
+_response_db_lock = threading.Lock()
+
+def _response_db_connection() -> Optional[sqlite3.Connection]:
+    """Open the on-disk response cache once; None if it can't be opened"""
+    global _response_db
+    if _response_db is None:
+        try:
+            RESPONSE_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(RESPONSE_DB_PATH, check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS responses "
+                       "(key TEXT PRIMARY KEY, response TEXT, created_at INTEGER)")
+            db.execute("DELETE FROM responses WHERE created_at < ?",
+                       (int(time.time()) - RESPONSE_DB_TTL_SECONDS,))
+            db.commit()
+            _response_db = db
+        except sqlite3.Error as e:
+            logger.warning("Response cache database unavailable: %s", e)
+            return None
+    return _response_db
+
+def _cached_response(key: str) -> Optional[str]:
+    """Return the cached response for key, or None if missing or expired"""
+    with _bedrock_cache_lock:
+        cached = _bedrock_response_cache.get(key)
+        if cached is not None:
+            expires_at, text = cached
+            if expires_at >= time.monotonic():
+                _bedrock_response_cache.move_to_end(key)
+                return text
+            del _bedrock_response_cache[key]
+    
+    with _response_db_lock:
+        db = _response_db_connection()
+        if db is None:
+            return None
+        row = db.execute("SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                         (key, int(time.time()) - RESPONSE_DB_TTL_SECONDS)).fetchone()
+    if row is None:
+        return None
+    _remember_response(key, row[0])
+    return row[0]
+
+def _remember_response(key: str, text: str):
+    """Store a response in memory, evicting the least recently used beyond the cache size"""
+    with _bedrock_cache_lock:
+        _bedrock_response_cache[key] = (time.monotonic() + BEDROCK_CACHE_TTL_SECONDS, text)
+        _bedrock_response_cache.move_to_end(key)
+        if len(_bedrock_response_cache) > BEDROCK_CACHE_SIZE:
+            _bedrock_response_cache.popitem(last=False)
+
+def _cache_response(key: str, text: str):
+    """Store a response in both cache tiers"""
+    _remember_response(key, text)
+    with _response_db_lock:
+        db = _response_db_connection()
+        if db is not None:
+            db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                       (key, text, int(time.time())))
+            db.commit()
+
+def _clear_response_cache():
+    """Drop every cached response from both tiers"""
+    with _bedrock_cache_lock:
+        _bedrock_response_cache.clear()
+    if _response_db is None and not RESPONSE_DB_PATH.exists():
+        # Nothing was ever cached on disk; don't create the database just to empty it
+        return
+    with _response_db_lock:
+        db = _response_db_connection()
+        if db is not None:
+            db.execute("DELETE FROM responses")
+            db.commit()
+
+# Bedrock has no JSON response mode for Claude, so constrain the output via the system prompt
+JSON_SYSTEM_PROMPT = (
+    "Respond with a single valid JSON object only. "
+    "Do not add any text, markdown or code fences before or after it."
+)
 
 class InlineAgent:
     def __init__(self, model_id: str = "anthropic.claude-3-sonnet-20240229-v1:0"):
         self.model_id = model_id
         self.session_id = None
     
-    def _format_prompt(self, prompt: str, action_groups: List[Dict] = None) -> str:
-        """Format the prompt with action groups"""
-        if not action_groups:
+    def reset(self):
+        """Start a fresh session and drop cached model responses"""
+        self.session_id = None
+        _clear_response_cache()
+    
+    def _format_prompt(self, prompt: str, actions_json: Optional[str] = None) -> str:
+        """Format the prompt with precomputed action group JSON"""
+        if not actions_json:
             return prompt
         
         formatted_prompt = f"""
         {prompt}
 
         Available Actions:
-        {json.dumps(action_groups, indent=2)}
+        {actions_json}
 
-        Please provide your response in the following JSON format:
+        Please provide your response as strict JSON (double-quoted keys and strings) in the following format:
         {{
             "reasoning": "Your step-by-step reasoning",
             "action": "The action you want to take",
@@ -224,43 +775,54 @@ class InlineAgent:
         """
         return formatted_prompt
 
-    def invoke(self, prompt: str, max_tokens = 2000, action_groups: List[Dict] = None) -> Dict:
+    def invoke(self, prompt: str, max_tokens: int = 4096, actions_json: Optional[str] = None,
+               temperature: float = 0.7, deterministic: bool = False) -> Dict:
         """
-        Invoke the model with prompt and optional action groups
+        Invoke the model with prompt and optional action groups.
+        Responses are cached when sampling is deterministic (temperature 0)
+        or the caller opts in with deterministic=True.
         """
         try:
-            if TRUNCATE_TOKENS:
-                # Reserve tokens for system message and response
-                system_reserve = 500
-                response_reserve = 1000
-                available_tokens = max_tokens - (system_reserve + response_reserve)
-
             request_body = {
                 "messages": [
                     {
                         "role": "user",
-                        "content": prompt#[:available_tokens]
+                        "content": prompt
                     }
                 ],
                 "anthropic_version": "bedrock-2023-05-31",
-                 "max_tokens": 4096,
-                "temperature": 0.7
+                "system": JSON_SYSTEM_PROMPT,
+                "max_tokens": max_tokens,
+                "temperature": temperature
             }
             
-            response = bedrock_runtime.invoke_model(
+            request_key = state_key({"modelId": self.model_id, **request_body})
+            cache_key = None
+            if temperature == 0 or deterministic:
+                cache_key = request_key
+                cached = _cached_response(cache_key)
+                if cached is not None:
+                    logger.info("Returning cached Bedrock response")
+                    return cached
+            
+            # Bedrock has no idempotency token; log the key so duplicates can be traced
+            logger.debug("Invoking %s with request key %s", self.model_id, request_key)
+            response = bedrock_runtime().invoke_model(
                 modelId=self.model_id,
                 contentType="application/json",
                 accept="application/json",
-                body=json.dumps(request_body)
+                body=_json_dumps(request_body)
             )
             
-            response_body = json.loads(response.get('body').read())
-            logger.debug(f"Raw Bedrock response: {json.dumps(response_body, indent=2)}")
+            response_body = _json_loads(_read_response_body(response.get('body')))
+            logger.debug("Raw Bedrock response: %s", response_body)
             
             # Extract the content from Claude's response
             if 'content' in response_body and len(response_body['content']) > 0:
                 text_response = response_body['content'][0].get('text', '')
-                logger.debug(f"Extracted text response: {text_response}")
+                logger.debug("Extracted text response: %s", text_response)
+                if cache_key is not None:
+                    _cache_response(cache_key, text_response)
                 return text_response
             else:
                 raise ValueError("No content in model response")
@@ -273,56 +835,57 @@ class InlineAgent:
             raise
             
     
+# strict=False tolerates raw control characters (e.g. newlines in code strings)
+_JSON_DECODER = json.JSONDecoder(strict=False)
+
+def extract_json_object(text: str) -> Optional[Dict]:
+    """
+    Return the first JSON object embedded in text, decoding in place from
+    each '{' with raw_decode instead of slicing and rewriting the string
+    """
+    start = text.find('{')
+    while start >= 0:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        start = text.find('{', start + 1)
+    return None
+
 def parse_response(response):
     """
     Parse response and extract components with detailed logging
     """
-    logger.debug(f"Raw response type: {type(response)}")
-    logger.debug(f"Raw response content: {response[:1000]}...")  # Log first 1000 chars
+    logger.debug("Raw response type: %s", type(response))
+    logger.debug("Raw response content: %.1000s...", response)  # Log first 1000 chars
     
     try:
-        # First, clean the response if it's a string
-        if isinstance(response, str):
-            # Try to find JSON content within the string
-            start_idx = response.find('{')
-            end_idx = response.rfind('}')
-            
-            if start_idx >= 0 and end_idx >= 0:
-                # Extract JSON portion
-                json_str = response[start_idx:end_idx + 1]
-                logger.debug(f"Extracted JSON string: {json_str[:1000]}...")
-                print(f"Extracted JSON string: {json_str[:1000]}...")
-                # Clean and format the JSON string
-                try:
-                    # Replace single quotes with double quotes
-                    json_str = json_str.replace("'", '"')
-                    
-                    # Ensure property names are properly quoted
-                    import re
-                    json_str = re.sub(r'(\w+)(?=\s*:)', r'"\1"', json_str)
-                    
-                    # Remove any extra whitespace
-                    json_str = json_str.strip()
-                    
-                    logger.debug(f"Cleaned JSON string: {json_str[:1000]}...")
-                    print(f"Cleaned JSON string: {json_str[:1000]}...")
-                    try:
-                        response_dict = json.loads(json_str)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse cleaned JSON: {e}")
-                        logger.error(f"Problematic JSON: {json_str}")
-                        return {}
-                        
-                except Exception as e:
-                    logger.error(f"Error cleaning JSON: {e}")
-                    return {}
-            else:
+        if isinstance(response, (str, bytes, bytearray)):
+            # Fast path: the model usually returns a bare JSON object
+            try:
+                response_dict = _json_loads(response)
+            except ValueError:
+                response_dict = None
+            # Otherwise extract the JSON object embedded in the text
+            if not isinstance(response_dict, dict):
+                if not isinstance(response, str):
+                    response = bytes(response).decode('utf-8', errors='replace')
+                response_dict = extract_json_object(response)
+            # Last resort: repair almost-valid JSON (trailing commas, single
+            # quotes, unquoted keys) without touching string contents
+            if response_dict is None and json_repair is not None:
+                repaired = json_repair.repair_json(response, return_objects=True)
+                response_dict = repaired if isinstance(repaired, dict) and repaired else None
+            if response_dict is None:
                 logger.warning("No JSON structure found in response")
                 return {}
         else:
             response_dict = response
         
-        logger.debug(f"Parsed dictionary: {json.dumps(response_dict, indent=2)[:1000]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parsed dictionary: %.1000s...", json.dumps(response_dict, indent=2))
         
         # Try different possible response structures
         if isinstance(response_dict, dict):
@@ -341,7 +904,8 @@ def parse_response(response):
             if not components and 'code' in response_dict:
                 return response_dict
                 
-            logger.debug(f"Final components: {json.dumps(components, indent=2)[:1000]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Final components: %.1000s...", json.dumps(components, indent=2))
             return components
         else:
             logger.warning(f"Response is not a dictionary: {type(response_dict)}")
@@ -398,7 +962,7 @@ def parse_response(response):
 #         """
         
 #         response = agent.invoke(prompt=prompt)
-#         logger.debug(f"Agent response: {response}")
+#         logger.debug("Agent response: %s", response)
         
 #         # Parse the response and extract components
 #         components = parse_response(response)
@@ -433,50 +997,50 @@ def parse_response(response):
 #         #     "tasks_completed": state.get('tasks_completed', [])
 #         # }
 
-def inline_architect_agent(state: WorkflowState) -> Dict:
-    """
-    Inline agent for architecture design
-    """
-    logger.info("Inline architect agent processing")
-    
-    try:
-        agent = InlineAgent()
-        
-        # Convert state to dictionary directly
-        state_dict = state if isinstance(state, dict) else dict(state)
-            
-        prompt = f"""
+# Static prompt skeleton for inline_architect_agent; %s is the user requirements
+_ARCHITECT_PROMPT_TEMPLATE = """
         You are an AWS Solutions Architect. Design a detailed architecture for the following requirements:
         
         Requirements:
-        {state_dict['user_requirements']}
+        %s
         
         Provide your response as a valid JSON object with the following structure:
-        {{
-            "nodes": {{
-                "service_name": {{
+        {
+            "nodes": {
+                "service_name": {
                     "type": "aws_service",
                     "service": "AWS Service Name",
                     "description": "Service description",
-                    "config": {{
+                    "config": {
                         "key": "value"
-                    }}
-                }}
-            }},
+                    }
+                }
+            },
             "edges": [
-                {{
+                {
                     "from": "service_name",
                     "to": "service_name",
                     "label": "interaction description"
-                }}
+                }
             ]
-        }}
+        }
         
         Ensure your response is properly formatted JSON without any additional text or explanations outside the JSON structure.
         """
+
+def inline_architect_agent(state: WorkflowState) -> Dict:
+    """
+    Inline agent for architecture design
+    """
+    logger.info("Inline architect agent processing")
+    
+    try:
+        agent = InlineAgent()
         
-        response = agent.invoke(prompt=prompt)
-        logger.debug(f"Agent response: {response}")
+        prompt = _ARCHITECT_PROMPT_TEMPLATE % (state['user_requirements'],)
+        
+        response = agent.invoke(prompt=prompt, temperature=DETERMINISTIC_TEMPERATURE)
+        logger.debug("Agent response: %s", response)
         
         # Parse the response and extract components
         components = parse_response(response)
@@ -487,13 +1051,13 @@ def inline_architect_agent(state: WorkflowState) -> Dict:
         if not isinstance(components, dict):
             raise ValueError(f"Invalid components type: {type(components)}")
         
-        dot = generate_aws_architecture_diagram(components)
+        diagram_source = aws_architecture_diagram_source(components)
         
         return {
-            "architecture_components": components,
-            "diagram_code": dot.source,
+            **architecture_update(components),
+            "diagram_code": diagram_source,
             "current_agent": "supervisor",
-            "tasks_completed": state_dict.get('tasks_completed', []) + ["architect"]
+            "tasks_completed": ["architect"]
         }
         
     except Exception as e:
@@ -501,7 +1065,7 @@ def inline_architect_agent(state: WorkflowState) -> Dict:
         return {
             "error": f"Architecture generation failed: {str(e)}",
             "current_agent": "supervisor",
-            "tasks_completed": state.get('tasks_completed', [])
+            "tasks_completed": []
         }
 
 
@@ -575,43 +1139,48 @@ def inline_architect_agent(state: WorkflowState) -> Dict:
 #             "tasks_completed": state.get('tasks_completed', [])
 #         }
 
-def inline_coder_agent(state: WorkflowState) -> Dict:
-    """
-    Inline agent for code generation
-    """
-    logger.info("Inline coder agent processing")
-    
-    try:
-        agent = InlineAgent()
-        action_groups = InlineAgentActions.get_code_actions()
-        
-        # Use state directly as dictionary
-        state_dict = state if isinstance(state, dict) else dict(state)
-        logger.debug(f"State dictionary: {state_dict}")
-        
-        prompt = f"""
+# Static prompt skeleton for inline_coder_agent; the placeholders are the
+# user requirements and the architecture components JSON
+_CODER_PROMPT_TEMPLATE = """
         As an AWS developer, generate implementation code for the following architecture.
         Return your response in valid JSON format.
 
         Requirements:
-        {state_dict['user_requirements']}
+        %s
 
         Architecture:
-        {json.dumps(state.get('architecture_components', {}), indent=2)}
+        %s
 
         Return ONLY a JSON object with this structure:
-        {{
-            "code": {{
+        {
+            "code": {
                 "infrastructure": "// AWS CDK code here",
                 "application": "// Application code here",
                 "deployment": "// Deployment scripts here",
                 "readme": "// Setup instructions here"
-            }},
+            },
             "explanation": "Brief explanation of the implementation"
-        }}
+        }
         """
+
+def inline_coder_agent(state: WorkflowState) -> Dict:
+    """
+    Inline agent for code generation
+    """
+    logger.info("Inline coder agent processing")
+    
+    try:
+        agent = InlineAgent()
+        
+        logger.debug("State dictionary: %s", state)
         
-        response = agent.invoke(prompt=prompt)
+        prompt = _CODER_PROMPT_TEMPLATE % (
+            state['user_requirements'],
+            architecture_json(state)
+        )
+        
+        response = agent.invoke(prompt=prompt, actions_json=_CODE_ACTIONS_JSON,
+                                temperature=DETERMINISTIC_TEMPERATURE)
         parsed_response = parse_response(response)
         
         if not parsed_response:
@@ -619,7 +1188,7 @@ def inline_coder_agent(state: WorkflowState) -> Dict:
             return {
                 "error": "Failed to generate valid code response",
                 "current_agent": "supervisor",
-                "tasks_completed": state_dict.get('tasks_completed', [])
+                "tasks_completed": []
             }
             
         try:
@@ -632,7 +1201,7 @@ def inline_coder_agent(state: WorkflowState) -> Dict:
                 "generated_code": generated_code,
                 "code_explanation": parsed_response.get('explanation', ''),
                 "current_agent": "supervisor",
-                "tasks_completed": state_dict.get('tasks_completed', []) + ["coder"]
+                "tasks_completed": ["coder"]
             }
             
         except AttributeError as ae:
@@ -640,7 +1209,7 @@ def inline_coder_agent(state: WorkflowState) -> Dict:
             return {
                 "error": "Invalid code format received from agent",
                 "current_agent": "supervisor",
-                "tasks_completed": state_dict.get('tasks_completed', [])
+                "tasks_completed": []
             }
             
     except Exception as e:
@@ -648,7 +1217,7 @@ def inline_coder_agent(state: WorkflowState) -> Dict:
         return {
             "error": f"Code generation failed: {str(e)}",
             "current_agent": "supervisor",
-            "tasks_completed": state.get('tasks_completed', [])
+            "tasks_completed": []
         }
 
 
@@ -686,8 +1255,9 @@ def create_inline_coder_agent() -> InlineAgent:
     
     return agent
 
-def create_workflow_diagram() -> graphviz.Digraph:
+def create_workflow_diagram() -> "graphviz.Digraph":
     """Create a visualization of the LangGraph workflow"""
+    import graphviz
     dot = graphviz.Digraph(comment='LangGraph Workflow')
     dot.attr(rankdir='LR')
     
@@ -706,9 +1276,9 @@ def create_workflow_diagram() -> graphviz.Digraph:
     
     # Add edges with descriptions
     dot.edge("START", "supervisor", "Initialize")
-    dot.edge("supervisor", "requirements_analyzer", "Analyze")
+    dot.edge("supervisor", "requirements_analyzer", "Analyze (parallel)")
     dot.edge("requirements_analyzer", "supervisor", "Complete")
-    dot.edge("supervisor", "architect", "Design")
+    dot.edge("supervisor", "architect", "Design (parallel)")
     dot.edge("architect", "supervisor", "Complete")
     dot.edge("supervisor", "coder", "Generate")
     dot.edge("coder", "supervisor", "Complete")
@@ -727,6 +1297,11 @@ def create_workflow_diagram() -> graphviz.Digraph:
 #     return state
 
 
+# Seconds a new server must stay up to count as started, and seconds a
+# stopping server gets to exit after SIGTERM before it is killed
+MCP_STARTUP_GRACE = 0.5
+MCP_STOP_TIMEOUT = 2.0
+
 class MCPServer:
     """MCP Server configuration and management"""
     
@@ -738,37 +1313,64 @@ class MCPServer:
         self.auto_approve = server_config.get('autoApprove', [])
         self.disabled = server_config.get('disabled', False)
         self.process = None
+        self._started = False
     
     def start(self):
-        """Start the MCP server"""
+        """Start the MCP server; a no-op while it is already running"""
         if self.disabled:
             logger.info(f"MCP server {self.name} is disabled")
             return
+        if self._started and self.process and self.process.poll() is None:
+            return
         
         try:
             # Prepare environment
             env = os.environ.copy()
             env.update(self.env)
             
-            # Start server process
+            # Start server process. stdout is the MCP channel; stderr is only
+            # logging and is discarded so an unread pipe can't block the child.
             self.process = subprocess.Popen(
                 [self.command] + self.args,
                 env=env,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                stderr=subprocess.DEVNULL
             )
             
+            # Readiness probe: a server that can't start (bad package, missing
+            # credentials) exits immediately
+            try:
+                returncode = self.process.wait(timeout=MCP_STARTUP_GRACE)
+            except subprocess.TimeoutExpired:
+                pass
+            else:
+                self.process = None
+                raise RuntimeError(f"MCP server exited on startup with code {returncode}")
+            
+            self._started = True
             logger.info(f"Started MCP server {self.name}")
             
         except Exception as e:
             logger.error(f"Failed to start MCP server {self.name}: {str(e)}")
             raise
     
-    def stop(self):
-        """Stop the MCP server"""
-        if self.process:
+    def terminate(self):
+        """Ask the MCP server to exit (SIGTERM) without waiting for it"""
+        if self.process and self.process.poll() is None:
             self.process.terminate()
+    
+    def stop(self, timeout: float = MCP_STOP_TIMEOUT):
+        """Stop the MCP server, killing it if it outlives the timeout"""
+        if self.process:
+            self.terminate()
+            try:
+                self.process.wait(timeout=max(timeout, 0))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"MCP server {self.name} did not exit, killing it")
+                self.process.kill()
+                self.process.wait()
             self.process = None
+            self._started = False
             logger.info(f"Stopped MCP server {self.name}")
 
 class MCPManager:
@@ -832,14 +1434,36 @@ class MCPManager:
             self.servers[name] = MCPServer(server_config)
     
     def start_servers(self):
-        """Start all configured MCP servers"""
-        for server in self.servers.values():
-            server.start()
+        """Start all configured MCP servers concurrently"""
+        with ThreadPoolExecutor(max_workers=len(self.servers) or 1,
+                                thread_name_prefix="mcp-start") as executor:
+            # list() waits for every start and re-raises the first failure
+            list(executor.map(MCPServer.start, self.servers.values()))
     
     def stop_servers(self):
-        """Stop all running MCP servers"""
+        """Stop all running MCP servers, sharing one shutdown deadline"""
         for server in self.servers.values():
-            server.stop()
+            server.terminate()
+        deadline = time.monotonic() + MCP_STOP_TIMEOUT
+        for server in self.servers.values():
+            server.stop(timeout=deadline - time.monotonic())
+
+_MCP_MANAGER_INSTANCE: Optional[MCPManager] = None
+_mcp_manager_lock = threading.Lock()
+
+def get_mcp_manager() -> MCPManager:
+    """
+    Return the process-wide MCPManager with its servers started. Servers are
+    spawned once and kept alive across workflow runs, then stopped at exit.
+    """
+    global _MCP_MANAGER_INSTANCE
+    with _mcp_manager_lock:
+        if _MCP_MANAGER_INSTANCE is None:
+            _MCP_MANAGER_INSTANCE = MCPManager()
+            atexit.register(_MCP_MANAGER_INSTANCE.stop_servers)
+        # Restarts any server that has exited; running ones are left alone
+        _MCP_MANAGER_INSTANCE.start_servers()
+        return _MCP_MANAGER_INSTANCE
 
 class MCPEnabledAgent:
     """Base class for agents with MCP capabilities"""
@@ -856,6 +1480,27 @@ class MCPEnabledAgent:
         # Implement MCP context retrieval logic here
         return {}
 
+_MCP_ARCHITECT_PROMPT = string.Template("""
+        As an AWS Solutions Architect, design a detailed architecture for the following requirements:
+        
+        Requirements:
+        $requirements
+        
+        CDK Context:
+        $cdk_context
+        
+        Cost Analysis Context:
+        $cost_context
+        
+        Create a complete AWS architecture design including:
+        1. Required AWS services
+        2. Service configurations
+        3. Interactions between services
+        4. Security considerations
+        5. Scalability aspects
+        6. Cost optimization
+        """)
+
 def mcp_architect_agent(state: WorkflowState) -> Dict:
     """
     Architect agent with MCP capabilities
@@ -863,9 +1508,8 @@ def mcp_architect_agent(state: WorkflowState) -> Dict:
     logger.info("MCP architect agent processing")
     
     try:
-        # Initialize MCP manager
-        mcp_manager = MCPManager()
-        mcp_manager.start_servers()
+        # Shared MCP manager; its servers stay up between runs
+        mcp_manager = get_mcp_manager()
         
         # Create agent with MCP capabilities
         agent = MCPEnabledAgent(mcp_manager)
@@ -877,45 +1521,27 @@ def mcp_architect_agent(state: WorkflowState) -> Dict:
         cost_context = agent._get_mcp_context("awslabs.cost-analysis-mcp-server")
         
         # Enhanced prompt with MCP context
-        prompt = f"""
-        As an AWS Solutions Architect, design a detailed architecture for the following requirements:
-        
-        Requirements:
-        {state['user_requirements']}
-        
-        CDK Context:
-        {json.dumps(cdk_context, indent=2)}
-        
-        Cost Analysis Context:
-        {json.dumps(cost_context, indent=2)}
-        
-        Create a complete AWS architecture design including:
-        1. Required AWS services
-        2. Service configurations
-        3. Interactions between services
-        4. Security considerations
-        5. Scalability aspects
-        6. Cost optimization
-        """
+        prompt = _MCP_ARCHITECT_PROMPT.substitute(
+            requirements=state['user_requirements'],
+            cdk_context=json.dumps(cdk_context, indent=2),
+            cost_context=json.dumps(cost_context, indent=2)
+        )
         
         # Use inline agent for generation
         inline_agent = InlineAgent()
-        response = inline_agent.invoke(prompt=prompt)
+        response = inline_agent.invoke(prompt=prompt, temperature=DETERMINISTIC_TEMPERATURE)
         
         components = response.get('result', {}).get('architecture', {})
         if not components:
             components = response.get('result', {})
         
-        dot = generate_aws_architecture_diagram(components)
-        
-        # Stop MCP servers
-        mcp_manager.stop_servers()
+        diagram_source = aws_architecture_diagram_source(components)
         
         return {
-            "architecture_components": components,
-            "diagram_code": dot.source,
+            **architecture_update(components),
+            "diagram_code": diagram_source,
             "current_agent": "supervisor",
-            "tasks_completed": state.get('tasks_completed', []) + ["architect"]
+            "tasks_completed": ["architect"]
         }
         
     except Exception as e:
@@ -923,7 +1549,7 @@ def mcp_architect_agent(state: WorkflowState) -> Dict:
         return {
             "error": f"Architecture generation failed: {str(e)}",
             "current_agent": "supervisor",
-            "tasks_completed": state.get('tasks_completed', [])
+            "tasks_completed": []
         }
 
 
@@ -934,109 +1560,234 @@ class SupervisorDecision(TypedDict):
 
 # Add nodes with better error handling
 def wrap_agent(agent_func):
-    """Wrapper to ensure consistent state handling and error recovery"""
-    def wrapped(state: WorkflowState) -> Dict:
+    """
+    Wrapper to ensure consistent state handling and error recovery.
+    Only the agent's updates are returned; LangGraph merges them into the
+    state, which lets agents in the same stage run in parallel. Agents get a
+    read-only view of the state, so it is shared rather than copied.
+    
+    Never return the state (or a ChainMap over it) merged with the update:
+    every key would be written back through its reducer, and operator.add
+    would duplicate tasks_completed.
+    
+    Agents that take an on_delta argument receive the callback passed as
+    config={"configurable": {"on_delta": ...}}, to stream their output.
+    """
+    streams = "on_delta" in inspect.signature(agent_func).parameters
+    
+    def wrapped(state: WorkflowState, config: Optional[Dict] = None) -> Dict:
         try:
-            result = agent_func(state)
-            # Ensure we always have the minimum required fields
-            return {
-                **state,  # Preserve existing state
-                **result,  # Add new results
-                "current_agent": result.get("current_agent", "supervisor"),  # Ensure we have next agent
-                "tasks_completed": result.get("tasks_completed", state.get("tasks_completed", []))
-            }
+            kwargs = {}
+            if streams:
+                kwargs["on_delta"] = ((config or {}).get("configurable") or {}).get("on_delta")
+            result = agent_func(MappingProxyType(state), **kwargs)
+            # Ensure we always have the minimum required fields. The agent's
+            # update dict is its own, so fill it in place rather than copying it.
+            result.setdefault("current_agent", "supervisor")  # Ensure we have next agent
+            return result
         except Exception as e:
             logger.error(f"Error in {agent_func.__name__}: {str(e)}")
             return {
-                **state,
                 "error": f"Error in {agent_func.__name__}: {str(e)}",
                 "current_agent": "supervisor"
             }
     return wrapped
 
-def invoke_claude(prompt: str, max_tokens: int = 2000, temperature: float = 0.5) -> str:
-    """Invoke Claude with the given prompt"""
+STREAM_MAX_ATTEMPTS = 3
+RETRYABLE_STREAM_ERRORS = frozenset((
+    'throttlingException', 'modelStreamErrorException', 'serviceUnavailableException'
+))
+
+def _stream_claude(request_body: Dict, parts: List[str],
+                   on_delta: Optional[Callable[[str], None]] = None,
+                   model_id: str = MODEL_ID) -> Dict:
+    """
+    Stream a Claude response, appending the text fragments to parts.
+    Returns the usage reported at the start of the message, with the
+    stop_reason reported at its end.
+    """
+    try:
+        response = bedrock_runtime().invoke_model_with_response_stream(
+            modelId=model_id,
+            contentType="application/json",
+            body=_json_dumps(request_body)
+        )
+    except ClientError as e:
+        # Models without prompt caching reject cache_control; resend the
+        # system prefix as plain text
+        system = request_body.get("system")
+        if not isinstance(system, list) or e.response.get('Error', {}).get('Code') != 'ValidationException':
+            raise
+        logger.warning("Prompt caching rejected by %s, retrying without it", model_id)
+        request_body["system"] = system[0]["text"]
+        response = bedrock_runtime().invoke_model_with_response_stream(
+            modelId=model_id,
+            contentType="application/json",
+            body=_json_dumps(request_body)
+        )
+    
+    usage = {}
+    for event in response.get('body'):
+        chunk = event.get('chunk')
+        if not chunk:
+            continue
+        message = _json_loads(chunk['bytes'])
+        if message['type'] == 'content_block_delta':
+            # Tool calls stream their input as partial JSON instead of text
+            delta = message['delta']
+            delta = delta.get('text') or delta.get('partial_json', '')
+            parts.append(delta)
+            if on_delta is not None:
+                on_delta(delta)
+        elif message['type'] == 'message_start':
+            usage = dict(message['message'].get('usage', {}))
+        elif message['type'] == 'message_delta':
+            usage['stop_reason'] = message['delta'].get('stop_reason')
+    return usage
+
+def invoke_claude(prompt: str, max_tokens: int = 2000, temperature: float = 0.5,
+                  system_prefix: Optional[str] = None,
+                  on_delta: Optional[Callable[[str], None]] = None,
+                  model_id: str = MODEL_ID,
+                  stop_sequences: Optional[List[str]] = None,
+                  tool: Optional[Dict] = None) -> str:
+    """
+    Invoke Claude with the given prompt. A static system_prefix is sent as a
+    cacheable system block so repeated calls only pay for the dynamic prompt.
+    Responses at low temperatures are served from the local response cache.
+    The response is streamed; on_delta, if given, receives each text fragment
+    as it arrives. Generation ends early at any of stop_sequences.
+    If a tool is given, the model is made to call it and the JSON input of
+    that call is returned instead of text.
+    """
     try:
         if TRUNCATE_TOKENS:
-            # Reserve tokens for system message and response
-            system_reserve = 500
-            response_reserve = 1000
-            available_tokens = max_tokens - (system_reserve + response_reserve)
-        logger.info(f"Invoking Claude with prompt length: {len(prompt)} characters")
-        body = json.dumps({
+            # Reserve tokens for the system message and the response
+            available_tokens = MODEL_CONTEXT_TOKENS - (SYSTEM_RESERVE_TOKENS + max_tokens)
+            prompt = truncate_to_tokens(prompt, available_tokens)
+        logger.debug("Invoking Claude with prompt length: %d characters", len(prompt))
+        request_body = {
             "anthropic_version": "bedrock-2023-05-31",
             "messages": [
                 {
                     "role": "user",
-                    "content": prompt[:available_tokens]
+                    "content": prompt
                 }
             ],
             "max_tokens": max_tokens,
             "temperature": temperature
-        })
-        
-        response = bedrock_runtime.invoke_model(
-            modelId=MODEL_ID,
-            contentType="application/json",
-            body=body
-        )
-        
-        response_body = json.loads(response.get('body').read())
-        return response_body.get('content')[0].get('text', '').strip()
+        }
+        if stop_sequences:
+            request_body["stop_sequences"] = stop_sequences
+        if tool:
+            request_body["tools"] = [tool]
+            request_body["tool_choice"] = {"type": "tool", "name": tool["name"]}
+        if system_prefix:
+            request_body["system"] = [{
+                "type": "text",
+                "text": system_prefix,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        
+        cache_key = None
+        if temperature <= CACHEABLE_MAX_TEMPERATURE:
+            cache_key = state_key({"modelId": model_id, **request_body})
+            cached = _cached_response(cache_key)
+            if cached is not None:
+                logger.info("Returning cached Claude response")
+                return cached
+        
+        # botocore retries failed requests, but not errors raised mid-stream;
+        # retry those with exponential backoff while nothing has been emitted
+        parts = []
+        for attempt in range(STREAM_MAX_ATTEMPTS):
+            try:
+                usage = _stream_claude(request_body, parts, on_delta, model_id)
+                break
+            except EventStreamError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if parts or code not in RETRYABLE_STREAM_ERRORS or attempt == STREAM_MAX_ATTEMPTS - 1:
+                    raise
+                logger.warning("Bedrock stream failed with %s, retrying", code)
+                time.sleep(2 ** attempt)
+        
+        logger.debug("Prompt cache read/write tokens: %s/%s",
+                     usage.get('cache_read_input_tokens', 0),
+                     usage.get('cache_creation_input_tokens', 0))
+        if usage.get('stop_reason') == 'max_tokens':
+            logger.warning("Claude response hit max_tokens=%d and was truncated", max_tokens)
+        text = "".join(parts).strip()
+        if cache_key is not None:
+            _cache_response(cache_key, text)
+        return text
     except Exception as e:
         logger.error(f"Error invoking Claude: {str(e)}")
         return f"Error generating response: {str(e)}"
 
+# Task stages run in order; the tasks within a stage are independent and
+# are dispatched in parallel
+TASK_STAGES = [
+    ("requirements_analyzer", "architect"),
+    ("coder",),
+    ("explainer",),
+    ("consolidator",)
+]
+
+def _pending_tasks(tasks_completed: frozenset) -> Tuple[str, ...]:
+    """Tasks of the first stage that isn't complete yet; empty when all are done"""
+    for stage in TASK_STAGES:
+        pending = tuple(task for task in stage if task not in tasks_completed)
+        if pending:
+            return pending
+    return ()
+
+def _build_routing_table() -> Dict[frozenset, Tuple[str, ...]]:
+    """Map every reachable set of completed tasks to the tasks that run next"""
+    table = {}
+    done = frozenset()
+    for stage in TASK_STAGES:
+        # Any subset of a parallel stage may have finished (e.g. one agent failed)
+        for size in range(len(stage)):
+            for finished in itertools.combinations(stage, size):
+                completed = done | frozenset(finished)
+                table[completed] = _pending_tasks(completed)
+        done |= frozenset(stage)
+    table[done] = ()
+    return table
+
+_ROUTING_TABLE = _build_routing_table()
+
 def supervisor_agent(state: WorkflowState) -> Dict:
     """
-    Supervisor agent that decides which task agent should run next
+    Supervisor agent that decides which task agents should run next
     """
     logger.info("Supervisor agent analyzing current state")
     
-    tasks_completed = state.get('tasks_completed', [])
-    current_state = {
-        **state,  # Preserve existing state
-        "tasks_completed": tasks_completed
-    }
+    tasks_completed = frozenset(state.get('tasks_completed', []))
+    pending = _ROUTING_TABLE.get(tasks_completed)
+    if pending is None:
+        # Task sets outside the stage plan are routed the slow way
+        pending = _pending_tasks(tasks_completed)
     
-    # Define the task sequence
-    task_sequence = [
-        "requirements_analyzer",
-        "architect",
-        "coder",
-        "explainer",
-        "consolidator"
-    ]
-    
-    # Find the next task that hasn't been completed
-    for task in task_sequence:
-        if task not in tasks_completed:
-            logger.info(f"Next task: {task}")
-            return {
-                **current_state,  # Keep existing state
-                "current_agent": task,  # Set next agent
-                "tasks_completed": tasks_completed  # Preserve completed tasks
-            }
+    if pending:
+        logger.info("Next tasks: %s", pending)
+        return {
+            "current_agent": "supervisor",
+            "next_agents": list(pending)
+        }
     
     # If all tasks are completed
     logger.info("All tasks completed")
     return {
-        **current_state,
-        "current_agent": "end"
+        "current_agent": "end",
+        "next_agents": []
     }
 
 
-def requirements_analyzer_agent(state: WorkflowState) -> Dict:
-    """
-    Agent responsible for analyzing requirements
-    """
-    logger.info("Requirements analyzer agent processing")
-    
-    prompt = f"""
-    As a senior software engineer, analyze these requirements and break them down into clear technical specifications:
-
-    User Requirements:
-    {state['user_requirements']}
+# Static instructions of each agent, sent as a cached system prefix; the
+# per-run requirements and artifacts go in the user message
+_ANALYZER_SYSTEM_PROMPT = """
+    As a senior software engineer, analyze the user's requirements and break them down into clear technical specifications.
 
     Provide a detailed analysis including:
     1. Main components/features needed
@@ -1044,55 +1795,125 @@ def requirements_analyzer_agent(state: WorkflowState) -> Dict:
     3. Any potential challenges
     4. Required libraries/dependencies
     """
+
+_ANALYZER_USER_PROMPT = string.Template("""
+    User Requirements:
+    $requirements
+    """)
+
+def requirements_analyzer_agent(state: WorkflowState) -> Dict:
+    """
+    Agent responsible for analyzing requirements
+    """
+    logger.info("Requirements analyzer agent processing")
+    
+    prompt = _ANALYZER_USER_PROMPT.substitute(requirements=state['user_requirements'])
     
-    analysis = invoke_claude(prompt)
-    tasks_completed = state.get('tasks_completed', [])
+    analysis = invoke_claude(prompt, max_tokens=1200, system_prefix=_ANALYZER_SYSTEM_PROMPT,
+                             model_id=FAST_MODEL_ID)
     
     return {
         "requirements_analysis": analysis,
         "current_agent": "supervisor",
-        "tasks_completed": tasks_completed + ["requirements_analyzer"]
+        "tasks_completed": ["requirements_analyzer"]
     }
 
 
-def generate_aws_architecture_diagram(components: Dict) -> graphviz.Digraph:
+# AWS service icons and colors, shared read-only by every diagram
+_AWS_STYLES = MappingProxyType({k: MappingProxyType(v) for k, v in {
+    'Lambda': {'shape': 'rectangle', 'color': 'orange', 'style': 'filled'},
+    'DynamoDB': {'shape': 'cylinder', 'color': 'blue', 'style': 'filled'},
+    'S3': {'shape': 'folder', 'color': 'brown', 'style': 'filled'},
+    'API Gateway': {'shape': 'diamond', 'color': 'lightblue', 'style': 'filled'},
+    'Cognito': {'shape': 'hexagon', 'color': 'purple', 'style': 'filled'},
+    'CloudFront': {'shape': 'triangle', 'color': 'lightgrey', 'style': 'filled'},
+    'VPC': {'shape': 'cloud', 'color': 'grey', 'style': 'filled'},
+    'ECS': {'shape': 'box3d', 'color': 'orange', 'style': 'filled'},
+    'EKS': {'shape': 'box3d', 'color': 'yellow', 'style': 'filled'},
+    'RDS': {'shape': 'cylinder', 'color': 'blue', 'style': 'filled'},
+    'Aurora': {'shape': 'cylinder', 'color': 'lightblue', 'style': 'filled'},
+    'CloudWatch': {'shape': 'note', 'color': 'lightgreen', 'style': 'filled'},
+    'X-Ray': {'shape': 'note', 'color': 'pink', 'style': 'filled'}
+}.items()})
+_DEFAULT_AWS_STYLE = MappingProxyType({'shape': 'box', 'color': 'white', 'style': 'filled'})
+_NODE_LABEL = "{}\n{}\n{}".format
+_EDGE_LABEL = "{}\n({})".format
+
+def generate_aws_architecture_diagram(components: Dict) -> "graphviz.Digraph":
     """Generate AWS architecture diagram using Graphviz"""
+    import graphviz
     dot = graphviz.Digraph(comment='AWS Architecture Diagram')
     dot.attr(rankdir='LR')
     
-    # AWS service icons and colors
-    aws_styles = {
-        'Lambda': {'shape': 'rectangle', 'color': 'orange', 'style': 'filled'},
-        'DynamoDB': {'shape': 'cylinder', 'color': 'blue', 'style': 'filled'},
-        'S3': {'shape': 'folder', 'color': 'brown', 'style': 'filled'},
-        'API Gateway': {'shape': 'diamond', 'color': 'lightblue', 'style': 'filled'},
-        'Cognito': {'shape': 'hexagon', 'color': 'purple', 'style': 'filled'},
-        'CloudFront': {'shape': 'triangle', 'color': 'lightgrey', 'style': 'filled'},
-        'VPC': {'shape': 'cloud', 'color': 'grey', 'style': 'filled'},
-        'ECS': {'shape': 'box3d', 'color': 'orange', 'style': 'filled'},
-        'EKS': {'shape': 'box3d', 'color': 'yellow', 'style': 'filled'},
-        'RDS': {'shape': 'cylinder', 'color': 'blue', 'style': 'filled'},
-        'Aurora': {'shape': 'cylinder', 'color': 'lightblue', 'style': 'filled'},
-        'CloudWatch': {'shape': 'note', 'color': 'lightgreen', 'style': 'filled'},
-        'X-Ray': {'shape': 'note', 'color': 'pink', 'style': 'filled'}
-    }
-    
     # Add nodes with AWS styling
     for name, details in components['nodes'].items():
         service = details.get('service', 'Unknown')
-        style = aws_styles.get(service, {'shape': 'box', 'color': 'white', 'style': 'filled'})
+        style = _AWS_STYLES.get(service, _DEFAULT_AWS_STYLE)
         
-        label = f"{service}\n{name}\n{details.get('description', '')}"
+        label = _NODE_LABEL(service, name, details.get('description', ''))
         dot.node(name, label, **style)
     
     # Add edges with protocols
     for edge in components['edges']:
-        label = f"{edge['label']}\n({edge.get('protocol', 'N/A')})"
+        label = _EDGE_LABEL(edge['label'], edge.get('protocol', 'N/A'))
         dot.edge(edge['from'], edge['to'], label)
     
     return dot
 
-def save_diagram(dot: graphviz.Digraph, name: str, formats: List[str] = ['pdf', 'png', 'svg']) -> Dict[str, str]:
+# LRU cache of diagram DOT sources keyed by the diagram builder and the
+# state_key of the components
+DIAGRAM_CACHE_SIZE = 128
+_diagram_source_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_diagram_cache_lock = threading.Lock()
+
+def _cached_diagram_source(build: Callable[[Dict], "graphviz.Digraph"], components: Dict) -> str:
+    """Return build(components).source, building it once per unique components"""
+    key = (build.__name__, state_key(components))
+    with _diagram_cache_lock:
+        if key in _diagram_source_cache:
+            _diagram_source_cache.move_to_end(key)
+            return _diagram_source_cache[key]
+    
+    source = build(components).source
+    with _diagram_cache_lock:
+        _diagram_source_cache[key] = source
+        if len(_diagram_source_cache) > DIAGRAM_CACHE_SIZE:
+            _diagram_source_cache.popitem(last=False)
+    return source
+
+def aws_architecture_diagram_source(components: Dict) -> str:
+    """Return the DOT source of the AWS architecture diagram, building it once per unique components"""
+    return _cached_diagram_source(generate_aws_architecture_diagram, components)
+
+def render_diagram(dot: "graphviz.Digraph", formats: List[str] = ['pdf', 'png', 'svg']) -> Dict[str, bytes]:
+    """
+    Render a diagram in memory in multiple formats
+    
+    Args:
+        dot: Graphviz diagram object
+        formats: List of formats to render (pdf, png, svg supported)
+    
+    Returns:
+        Dictionary with format as key and rendered bytes as value; formats
+        that fail to render are logged and left out
+    """
+    # Each format is a separate Graphviz process, so lay them out concurrently.
+    # pipe() returns the bytes directly and, unlike render(), shares no
+    # intermediate file between the workers.
+    rendered = {}
+    with ThreadPoolExecutor(max_workers=len(formats) or 1,
+                            thread_name_prefix="diagram-render") as executor:
+        futures = {executor.submit(dot.pipe, format=fmt): fmt for fmt in formats}
+        for future in as_completed(futures):
+            fmt = futures[future]
+            try:
+                rendered[fmt] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to render {fmt} format: {str(e)}")
+    
+    return rendered
+
+def save_diagram(dot: "graphviz.Digraph", name: str, formats: List[str] = ['pdf', 'png', 'svg']) -> Dict[str, str]:
     """
     Save diagram in multiple formats and return their paths
     
@@ -1107,19 +1928,19 @@ def save_diagram(dot: graphviz.Digraph, name: str, formats: List[str] = ['pdf',
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     base_filename = f"{name}_{timestamp}"
     output_dir = "generated_diagrams"
+    filepath = os.path.join(output_dir, base_filename)
     
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     saved_files = {}
-    for fmt in formats:
+    for fmt, data in render_diagram(dot, formats).items():
+        output_path = f"{filepath}.{fmt}"
         try:
-            filename = base_filename  # Remove .{fmt} since render() adds it
-            filepath = os.path.join(output_dir, filename)
-            dot.render(filepath, format=fmt, cleanup=True)
-            # The actual file will be saved as {filepath}.{fmt}
-            saved_files[fmt] = f"{filepath}.{fmt}"
-            logger.info(f"Saved diagram as {filepath}.{fmt}")
+            with open(output_path, "wb") as f:
+                f.write(data)
+            saved_files[fmt] = output_path
+            logger.info(f"Saved diagram as {output_path}")
         except Exception as e:
             logger.error(f"Failed to save {fmt} format: {str(e)}")
     
@@ -1129,47 +1950,37 @@ def get_diagram_base64(file_path: str) -> str:
     """Convert diagram file to base64 string"""
     try:
         with open(file_path, "rb") as file:
-            return base64.b64encode(file.read()).decode()
+            # Encode straight from a memory map rather than a read() copy
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return base64.b64encode(data).decode()
     except Exception as e:
         logger.error(f"Failed to convert diagram to base64: {str(e)}")
         return ""
 
-def architect_agent(state: WorkflowState) -> Dict:
-    """
-    Agent responsible for creating AWS architecture diagrams
-    """
-    logger.info("Architect agent processing")
-    
-    prompt = f"""
-    As a senior AWS solutions architect, analyze these requirements and create a detailed AWS architecture:
-
-    Requirements:
-    {state['user_requirements']}
+_ARCHITECT_SYSTEM_PROMPT = """
+    As a senior AWS solutions architect, analyze the user's requirements and create a detailed AWS architecture.
 
-    Analysis:
-    {state.get('requirements_analysis', '')}
-
-    Provide the architecture components in the following JSON format:
-    {{
-        "nodes": {{
-            "component_name": {{
+    Submit the architecture components with the submit_architecture tool, in the following format:
+    {
+        "nodes": {
+            "component_name": {
                 "type": "aws_service",
                 "service": "<AWS Service Name>",
                 "description": "description",
-                "config": {{
+                "config": {
                     "key": "value"  // Service-specific configuration
-                }}
-            }}
-        }},
+                }
+            }
+        },
         "edges": [
-            {{
+            {
                 "from": "component_name",
                 "to": "component_name",
                 "label": "interaction description",
                 "protocol": "protocol used"
-            }}
+            }
         ]
-    }}
+    }
 
 Use appropriate AWS services for:
 - Compute (Lambda, ECS, EKS)
@@ -1178,16 +1989,67 @@ Use appropriate AWS services for:
 - Networking (VPC, API Gateway, CloudFront)
 - Security (Cognito, IAM, KMS)
 - Monitoring (CloudWatch, X-Ray)
+    """
+
+_ARCHITECT_USER_PROMPT = string.Template("""
+    Requirements:
+    $requirements
+    """)
+
+# Tool the architect is made to call; its input schema constrains the model
+# to emit the architecture as JSON with no surrounding prose
+_ARCHITECTURE_TOOL = {
+    "name": "submit_architecture",
+    "description": "Submit the AWS architecture components and their interactions",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "nodes": {
+                "type": "object",
+                "additionalProperties": {
+                    "type": "object",
+                    "properties": {
+                        "type": {"type": "string"},
+                        "service": {"type": "string"},
+                        "description": {"type": "string"},
+                        "config": {"type": "object"}
+                    },
+                    "required": ["type", "service", "description"]
+                }
+            },
+            "edges": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "from": {"type": "string"},
+                        "to": {"type": "string"},
+                        "label": {"type": "string"},
+                        "protocol": {"type": "string"}
+                    },
+                    "required": ["from", "to"]
+                }
+            }
+        },
+        "required": ["nodes", "edges"]
+    }
+}
 
-Return only the JSON without additional text.
+def architect_agent(state: WorkflowState) -> Dict:
+    """
+    Agent responsible for creating AWS architecture diagrams
     """
+    logger.info("Architect agent processing")
+    
+    prompt = _ARCHITECT_USER_PROMPT.substitute(requirements=state['user_requirements'])
     
-    components_json = invoke_claude(prompt)
-    tasks_completed = state.get('tasks_completed', [])
+    components_json = invoke_claude(prompt, max_tokens=1500, temperature=DETERMINISTIC_TEMPERATURE,
+                                    system_prefix=_ARCHITECT_SYSTEM_PROMPT, tool=_ARCHITECTURE_TOOL)
     
     try:
-        components = json.loads(components_json)
-        dot = generate_aws_architecture_diagram(components)
+        components = loads_model_json(components_json)
+        import graphviz
+        dot = graphviz.Source(aws_architecture_diagram_source(components))
         # Generate a name for the diagram based on the first service or default
         first_service = next(iter(components['nodes'].values()))['service'] if components['nodes'] else 'architecture'
         diagram_name = f"aws_{first_service.lower()}_architecture"
@@ -1195,45 +2057,25 @@ Return only the JSON without additional text.
         # Save diagram in multiple formats
         saved_files = save_diagram(dot, diagram_name, formats=['pdf', 'png', 'svg'])
         
-        # Add diagram information to components
+        # Add diagram information to components. Only the paths are kept in
+        # the state; use get_diagram_base64 where an inline encoding is needed.
         components['diagram_files'] = saved_files
-        
-        # Add base64 encoded versions for web display
-        components['diagram_base64'] = {
-            fmt: get_diagram_base64(filepath)
-            for fmt, filepath in saved_files.items()
-        }
         return {
-            "architecture_components": components,
+            **architecture_update(components),
             "diagram_code": dot.source,
             "current_agent": "supervisor",
-            "tasks_completed": tasks_completed + ["architect"]
+            "tasks_completed": ["architect"]
         }
     except Exception as e:
         logger.error(f"Architect agent error: {str(e)}")
         return {
             "error": f"Architecture generation failed: {str(e)}",
             "current_agent": "supervisor",
-            "tasks_completed": tasks_completed
+            "tasks_completed": []
         }
 
-def coder_agent(state: WorkflowState) -> Dict:
-    """
-    Agent responsible for generating AWS implementation code
-    """
-    logger.info("Coder agent processing")
-    
-    prompt = f"""
-    Generate production-ready AWS implementation code based on these requirements and architecture:
-
-    Requirements:
-    {state['user_requirements']}
-
-    Analysis:
-    {state.get('requirements_analysis', '')}
-
-    Architecture:
-    {json.dumps(state.get('architecture_components', {}), indent=2)}
+_CODER_SYSTEM_PROMPT = """
+    Generate production-ready AWS implementation code based on the requirements and architecture provided.
 
     Generate the following files:
     1. Infrastructure as Code (AWS CDK in TypeScript)
@@ -1251,39 +2093,51 @@ def coder_agent(state: WorkflowState) -> Dict:
 
     Return the code as a JSON object with file paths as keys and content as values.
     """
+
+_CODER_USER_PROMPT = string.Template("""
+    Requirements:
+    $requirements
+
+    Analysis:
+    $analysis
+
+    Architecture:
+    $architecture
+    """)
+
+def coder_agent(state: WorkflowState) -> Dict:
+    """
+    Agent responsible for generating AWS implementation code
+    """
+    logger.info("Coder agent processing")
+    
+    prompt = _CODER_USER_PROMPT.substitute(
+        requirements=state['user_requirements'],
+        analysis=state.get('requirements_analysis', ''),
+        architecture=architecture_json(state)
+    )
     
-    code_json = invoke_claude(prompt)
-    tasks_completed = state.get('tasks_completed', [])
+    # Several complete files in one JSON object; 2000 tokens truncated it
+    code_json = invoke_claude(prompt, max_tokens=4096, temperature=DETERMINISTIC_TEMPERATURE,
+                              system_prefix=_CODER_SYSTEM_PROMPT)
     
     try:
-        generated_code = json.loads(code_json)
+        generated_code = loads_model_json(code_json)
         return {
             "generated_code": generated_code,
             "current_agent": "supervisor",
-            "tasks_completed": tasks_completed + ["coder"]
+            "tasks_completed": ["coder"]
         }
     except Exception as e:
         logger.error(f"Coder agent error: {str(e)}")
         return {
             "error": f"Code generation failed: {str(e)}",
             "current_agent": "supervisor",
-            "tasks_completed": tasks_completed
+            "tasks_completed": []
         }
 
-def explainer_agent(state: WorkflowState) -> Dict:
-    """
-    Agent responsible for explaining the code
-    """
-    logger.info("Explainer agent processing")
-    
-    prompt = f"""
-    Explain this code and architecture in detail:
-
-    Code:
-    {state.get('generated_code', '')}
-
-    Architecture:
-    {json.dumps(state.get('architecture_components', {}), indent=2)}
+_EXPLAINER_SYSTEM_PROMPT = """
+    Explain the code and architecture provided in detail.
 
     Include:
     1. Overall architecture and design choices
@@ -1292,14 +2146,35 @@ def explainer_agent(state: WorkflowState) -> Dict:
     4. Implementation details
     5. Usage instructions
     """
+
+_EXPLAINER_USER_PROMPT = string.Template("""
+    Code:
+    $code
+
+    Architecture:
+    $architecture
+    """)
+
+def explainer_agent(state: WorkflowState,
+                    on_delta: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Agent responsible for explaining the code. The explanation is streamed
+    to on_delta as it is generated.
+    """
+    logger.info("Explainer agent processing")
+    
+    prompt = _EXPLAINER_USER_PROMPT.substitute(
+        code=state.get('generated_code', ''),
+        architecture=architecture_json(state)
+    )
     
-    explanation = invoke_claude(prompt)
-    tasks_completed = state.get('tasks_completed', [])
+    explanation = invoke_claude(prompt, max_tokens=1000, system_prefix=_EXPLAINER_SYSTEM_PROMPT,
+                                on_delta=on_delta, model_id=FAST_MODEL_ID)
     
     return {
         "code_explanation": explanation,
         "current_agent": "supervisor",
-        "tasks_completed": tasks_completed + ["explainer"]
+        "tasks_completed": ["explainer"]
     }
 
 def consolidator_agent(state: WorkflowState) -> Dict:
@@ -1320,49 +2195,71 @@ def consolidator_agent(state: WorkflowState) -> Dict:
         }
     }
     
-    tasks_completed = state.get('tasks_completed', [])
     
     return {
         "final_output": final_output,
         "current_agent": "end",
-        "tasks_completed": tasks_completed + ["consolidator"]
+        "tasks_completed": ["consolidator"]
     }
 
-def generate_architecture_diagram(components: Dict) -> graphviz.Digraph:
+# Graphviz node attributes for each generic component type
+_COMPONENT_STYLES = MappingProxyType({k: MappingProxyType(v) for k, v in {
+    'service': {'shape': 'rectangle', 'style': 'rounded', 'color': 'blue'},
+    'database': {'shape': 'cylinder', 'color': 'orange'},
+    'storage': {'shape': 'folder', 'color': 'green'},
+    'compute': {'shape': 'box3d', 'color': 'red'},
+    'network': {'shape': 'diamond', 'color': 'purple'},
+    'client': {'shape': 'component', 'color': 'gray'}
+}.items()})
+_DEFAULT_COMPONENT_STYLE = MappingProxyType({})
+
+def generate_architecture_diagram(components: Dict) -> "graphviz.Digraph":
     """Generate architecture diagram using Graphviz"""
+    import graphviz
     dot = graphviz.Digraph(comment='Architecture Diagram')
     dot.attr(rankdir='LR')
     
-    styles = {
-        'service': {'shape': 'rectangle', 'style': 'rounded', 'color': 'blue'},
-        'database': {'shape': 'cylinder', 'color': 'orange'},
-        'storage': {'shape': 'folder', 'color': 'green'},
-        'compute': {'shape': 'box3d', 'color': 'red'},
-        'network': {'shape': 'diamond', 'color': 'purple'},
-        'client': {'shape': 'component', 'color': 'gray'}
-    }
-    
     # Validate components structure
     if not isinstance(components, dict):
         raise ValueError("Components must be a dictionary")
     if 'nodes' not in components or 'edges' not in components:
         raise ValueError("Components must contain 'nodes' and 'edges' keys")
     
+    # Declare each type's nodes in one subgraph whose node_attr carries the
+    # shared style, instead of repeating the attributes on every node
+    groups = defaultdict(list)
     for name, details in components['nodes'].items():
-        node_style = styles.get(details['type'], {})
-        dot.node(name, f"{name}\n{details.get('description', '')}", **node_style)
+        groups[details['type']].append((name, f"{name}\n{details.get('description', '')}"))
+    for node_type, nodes in groups.items():
+        style = _COMPONENT_STYLES.get(node_type, _DEFAULT_COMPONENT_STYLE)
+        with dot.subgraph(node_attr=dict(style)) as group:
+            for name, label in nodes:
+                group.node(name, label)
     
     for edge in components['edges']:
         dot.edge(edge['from'], edge['to'], edge.get('label', ''))
     
     return dot
 
+def architecture_diagram_source(components: Dict) -> str:
+    """Return the DOT source of the architecture diagram, building it once per unique components"""
+    return _cached_diagram_source(generate_architecture_diagram, components)
+
 def router(state: WorkflowState) -> str:
     """Route to the next agent based on current_agent"""
     current_agent = state.get("current_agent", "supervisor")
-    logger.info(f"Routing to: {current_agent}")
+    logger.info("Routing to: %s", current_agent)
     return current_agent
 
+def supervisor_router(state: WorkflowState) -> List[str] | str:
+    """Fan out to every agent the supervisor scheduled, or finish"""
+    if state.get("current_agent") == "end":
+        logger.info("Routing to: end")
+        return "end"
+    next_agents = state.get("next_agents", [])
+    logger.info("Routing to: %s", next_agents)
+    return next_agents
+
 # Create the workflow
 workflow = StateGraph(WorkflowState)
 
@@ -1383,7 +2280,7 @@ workflow.set_entry_point("supervisor")
 # Add conditional edges
 workflow.add_conditional_edges(
     "supervisor",
-    router,
+    supervisor_router,
     {
         "requirements_analyzer": "requirements_analyzer",
         "architect": "architect",
@@ -1423,17 +2320,18 @@ def run_workflow_debug(requirements: str):
             "current_agent": "requirements_analyzer",
             "tasks_completed": [],
             "architecture_components": {},
+            "architecture_components_json": None,
             "generated_code": {},
             "explanation": "",
             "final_output": ""
         }
         
-        logger.debug(f"Initial state: {json.dumps(initial_state, indent=2)}")
+        logger.debug("Initial state: %s", initial_state)
         
         # Run the workflow
         result = multi_agent_assistant.invoke(initial_state)
         
-        logger.debug(f"Final result: {json.dumps(result, indent=2)}")
+        logger.debug("Final result: %s", result)
         return result
         
     except Exception as e:
@@ -1456,7 +2354,7 @@ if __name__ == "__main__":
         
         # Print final output
         print("\n=== Final Architecture ===")
-        print(json.dumps(result.get("architecture_components", {}), indent=2))
+        print(architecture_json(result))
         
         print("\n=== Generated Code ===")
         print(json.dumps(result.get("generated_code", {}), indent=2))
@@ -1,15 +1,39 @@
 import streamlit as st
 from graph_workflow import vibe_coding_assistant, architecture_assistant
-import graphviz
-import logging
-import base64
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-from datetime import datetime
-st.title("Vibe Coding Assistant")
+if TYPE_CHECKING:
+    import graphviz
+
+SIDEBAR_LEGEND = """
+### Component Types
+- 🟦 Service: Application services and APIs
+- 🟧 Database: Data storage systems
+- 🟩 Storage: File storage systems
+- 🟥 Compute: Processing units
+- 🟪 Network: Network components
+- ⬜ Client: User-facing components
+
+### How to Use
+1. Choose the tab for your desired functionality
+2. Enter your requirements
+3. Click the generate button
+4. View the results
+"""
+
+@st.cache_resource
+def _graphviz():
+    """Import graphviz on first use rather than at startup"""
+    import graphviz
+    return graphviz
 
-def create_detailed_graph_visualization() -> graphviz.Digraph:
+def create_detailed_graph_visualization() -> "graphviz.Digraph":
     """Create a visualization of the LangGraph workflow"""
-    dot = graphviz.Digraph(comment='LangGraph Workflow')
+    dot = _graphviz().Digraph(comment='LangGraph Workflow')
     dot.attr(rankdir='LR')
     
     # Style definitions
@@ -31,10 +55,21 @@ def create_detailed_graph_visualization() -> graphviz.Digraph:
     
     return dot
 
-def save_diagram(dot: graphviz.Digraph, name: str, formats=['pdf', 'png', 'svg']) -> dict:
+@st.cache_data(ttl=None, show_spinner=False)
+def workflow_diagram_source() -> str:
+    """DOT source of the workflow diagram, built once rather than on every rerun"""
+    return create_detailed_graph_visualization().source
+
+@lru_cache(maxsize=32)
+def _render_bytes(source: str, fmt: str) -> bytes:
+    """Render DOT source to the given format, once per unique source and format"""
+    return _graphviz().Source(source).pipe(format=fmt)
+
+def save_diagram(dot: "graphviz.Digraph", name: str, formats=['pdf', 'png', 'svg']) -> dict:
     """
     Save diagram in multiple formats and return their paths
     """
+    from datetime import datetime
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     base_filename = f"{name}_{timestamp}"
     output_dir = "generated_diagrams"
@@ -42,79 +77,40 @@ def save_diagram(dot: graphviz.Digraph, name: str, formats=['pdf', 'png', 'svg']
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
+    def save(fmt: str) -> str:
+        filepath = os.path.join(output_dir, f"{base_filename}.{fmt}")
+        with open(filepath, "wb") as f:
+            f.write(_render_bytes(dot.source, fmt))
+        return filepath
+    
+    # Each format is laid out by its own Graphviz process; run them concurrently
     saved_files = {}
-    for fmt in formats:
-        try:
-            filename = f"{base_filename}.{fmt}"
-            filepath = os.path.join(output_dir, filename)
-            dot.render(filepath, format=fmt, cleanup=True)
-            saved_files[fmt] = filepath
-        except Exception as e:
-            st.error(f"Failed to save {fmt} format: {str(e)}")
+    with ThreadPoolExecutor(max_workers=len(formats) or 1) as executor:
+        futures = {executor.submit(save, fmt): fmt for fmt in formats}
+        for future in as_completed(futures):
+            fmt = futures[future]
+            try:
+                saved_files[fmt] = future.result()
+            except Exception as e:
+                st.error(f"Failed to save {fmt} format: {str(e)}")
     
     return saved_files
 
-def get_download_link(file_path: str, format: str) -> str:
-    """
-    Generate a download link for a file
-    """
-    try:
-        with open(file_path, "rb") as file:
-            contents = file.read()
-        b64 = base64.b64encode(contents).decode()
-        filename = os.path.basename(file_path)
-        return f'<a href="data:application/{format};base64,{b64}" download="{filename}">Download {format.upper()}</a>'
-    except Exception as e:
-        return f"Error generating download link: {str(e)}"
+DOWNLOAD_MIME_TYPES = {"pdf": "application/pdf", "png": "image/png", "svg": "image/svg+xml"}
+
+@st.cache_data(ttl=300, show_spinner=False)
+def read_download(file_path: str, mtime: float) -> bytes:
+    """Read a file for download; keyed on mtime so reruns don't re-read it"""
+    return Path(file_path).read_bytes()
 
 
 # Update your Streamlit interface
 st.title("Vibe Coding Assistant")
 
-# Create tabs for different functionalities
-tab1, tab2, tab3 = st.tabs(["Code Generation", "Architecture Diagram", "Workflow Visualization"])
-
-# ... (keep existing tab1 and tab2 code)
-
-with tab3:
-    st.subheader("LangGraph Workflow")
-    workflow_dot = create_detailed_graph_visualization()
-    st.graphviz_chart(workflow_dot)
-    
-    st.markdown("""
-    ### Workflow Steps
-    1. **Start**: Workflow initialization
-    2. **Parse Requirements**: Analyzes user input and breaks down requirements
-    3. **Generate Code**: Creates implementation based on analysis
-    4. **Explain Code**: Provides detailed explanation of generated code
-    5. **End**: Workflow completion
-    
-    ### Process Flow
-    - Each step processes the input and updates the state
-    - State transitions are managed by the workflow router
-    - Results are accumulated through the process
-    """)
-
-    # Add download capability for workflow diagram
-    if st.button("Download Workflow Diagram"):
-        try:
-            saved_files = save_diagram(workflow_dot, "langgraph_workflow", formats=['png', 'pdf', 'svg'])
-            
-            st.subheader("Download Workflow Diagram")
-            cols = st.columns(len(saved_files))
-            for i, (fmt, filepath) in enumerate(saved_files.items()):
-                with cols[i]:
-                    st.markdown(
-                        get_download_link(filepath, fmt),
-                        unsafe_allow_html=True
-                    )
-        except Exception as e:
-            st.error(f"Failed to save workflow diagram: {str(e)}")
-
-# # Create tabs for different functionalities
-# tab1, tab2 = st.tabs(["Code Generation", "Architecture Diagram"])
-
-with tab1:
+# Each tab is a fragment: interacting with one tab's widgets reruns only
+# that tab, not the others' rendering (e.g. the workflow graph)
+@st.fragment
+def _render_code_tab():
     code_input = st.text_area("Describe what you want to build:", height=200, key="code_input")
     
     if st.button("Generate Code"):
@@ -147,7 +143,8 @@ with tab1:
         else:
             st.error("Please enter your requirements first.")
 
-with tab2:
+@st.fragment
+def _render_architecture_tab():
     arch_input = st.text_area("Describe the system architecture:", height=200, key="arch_input",
                              placeholder="Example: Create a web application with a React frontend, Python backend API, and PostgreSQL database...")
     
@@ -174,7 +171,7 @@ with tab2:
                         if "diagram_code" in result:
                             st.subheader("Architecture Diagram")
                             try:
-                                dot = graphviz.Source(result["diagram_code"])
+                                dot = _graphviz().Source(result["diagram_code"])
                                 st.graphviz_chart(dot)
                             except Exception as e:
                                 st.error(f"Failed to render diagram: {str(e)}")
@@ -183,73 +180,56 @@ with tab2:
         else:
             st.error("Please enter your architecture requirements first.")
 
-# Add sidebar with component information
-st.sidebar.markdown("""
-### Component Types
-- 🟦 Service: Application services and APIs
-- 🟧 Database: Data storage systems
-- 🟩 Storage: File storage systems
-- 🟥 Compute: Processing units
-- 🟪 Network: Network components
-- ⬜ Client: User-facing components
-
-### How to Use
-1. Choose the tab for your desired functionality
-2. Enter your requirements
-3. Click the generate button
-4. View the results
-""")
+@st.fragment
+def _render_workflow_tab():
+    st.subheader("LangGraph Workflow")
+    workflow_dot = _graphviz().Source(workflow_diagram_source())
+    st.graphviz_chart(workflow_dot)
+    
+    st.markdown("""
+    ### Workflow Steps
+    1. **Start**: Workflow initialization
+    2. **Parse Requirements**: Analyzes user input and breaks down requirements
+    3. **Generate Code**: Creates implementation based on analysis
+    4. **Explain Code**: Provides detailed explanation of generated code
+    5. **End**: Workflow completion
+    
+    ### Process Flow
+    - Each step processes the input and updates the state
+    - State transitions are managed by the workflow router
+    - Results are accumulated through the process
+    """)
 
+    # Add download capability for workflow diagram
+    if st.button("Download Workflow Diagram"):
+        try:
+            saved_files = save_diagram(workflow_dot, "langgraph_workflow", formats=['png', 'pdf', 'svg'])
+            
+            st.subheader("Download Workflow Diagram")
+            cols = st.columns(len(saved_files))
+            for i, (fmt, filepath) in enumerate(saved_files.items()):
+                with cols[i]:
+                    st.download_button(
+                        f"Download {fmt.upper()}",
+                        data=read_download(filepath, os.path.getmtime(filepath)),
+                        file_name=Path(filepath).name,
+                        mime=DOWNLOAD_MIME_TYPES.get(fmt, "application/octet-stream"),
+                        key=f"dl_{fmt}"
+                    )
+        except Exception as e:
+            st.error(f"Failed to save workflow diagram: {str(e)}")
 
+# Create tabs for different functionalities
+tab1, tab2, tab3 = st.tabs(["Code Generation", "Architecture Diagram", "Workflow Visualization"])
 
+with tab1:
+    _render_code_tab()
 
-# # Update your Streamlit app to use the detailed visualization:
-# st.title("Vibe Coding Assistant")
+with tab2:
+    _render_architecture_tab()
 
-# # Create two columns
-# col1, col2 = st.columns([2, 1])
+with tab3:
+    _render_workflow_tab()
 
-# with col1:
-#     user_input = st.text_area("Describe what you want to build:", height=200)
-    
-#     if st.button("Generate Code"):
-#         if user_input:
-#             initial_state = {
-#                 "user_requirements": user_input,
-#                 "current_step": "parse_requirements",
-#                 "requirements_analysis": None,
-#                 "generated_code": None,
-#                 "explanations": None
-#             }
-
-#             with st.spinner("Processing your request..."):
-#                 result = vibe_coding_assistant.invoke(initial_state)
-
-#                 if "requirements_analysis" in result:
-#                     st.subheader("Requirements Analysis")
-#                     st.write(result["requirements_analysis"])
-
-#                 if "generated_code" in result:
-#                     st.subheader("Generated Code")
-#                     st.code(result["generated_code"])
-
-#                 if "explanations" in result:
-#                     st.subheader("Code Explanation")
-#                     st.write(result["explanations"])
-#         else:
-#             st.error("Please enter your requirements first.")
-
-# # Show graph visualization in the second column
-# with col2:
-#     st.subheader("Workflow Graph")
-#     detailed_dot = create_detailed_graph_visualization()
-#     st.graphviz_chart(detailed_dot)
-    
-#     st.markdown("""
-#     ### Graph Legend
-#     - **START**: Entry point
-#     - **Parse Requirements**: Analyzes user input
-#     - **Generate Code**: Creates code implementation
-#     - **Explain Code**: Provides code explanation
-#     - **END**: Completion point
-#     """)
\ No newline at end of file
+# Add sidebar with component information
+st.sidebar.markdown(SIDEBAR_LEGEND)
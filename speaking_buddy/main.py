@@ -1,16 +1,66 @@
 """Speaking Buddy - Streamlit Pronunciation Learning Tool with User Authentication"""
 import streamlit as st
-from pathlib import Path
-from audiorecorder import audiorecorder
-from datetime import datetime
+import hashlib
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
 
-from src.reference_manager import ensure_reference_exists
-from src.pronunciation_checker import compare_pronunciations_praat
 from src.session_manager import SessionManager
 from src.config import USER_RECORDINGS_DIR, MAX_ATTEMPTS_PER_WORD
 from src import database
 
 
+# Seconds between checks on a running pronunciation analysis
+COMPARE_POLL_INTERVAL = 0.25
+# Most recent pronunciation comparisons kept in memory
+COMPARE_CACHE_SIZE = 256
+
+# Display labels for the phonetic feature scores, in display order
+FEATURE_LABELS = MappingProxyType({
+    "pitch": "🎵 Intonation",
+    "formants": "🗣️ Vowel Quality",
+    "intensity": "💪 Stress Patterns",
+    "duration": "⏱️ Timing/Rhythm",
+    "voice_quality": "✨ Voice Clarity"
+})
+
+# (minimum score, color, emoji), from the highest bucket down
+SCORE_BUCKETS = (
+    (80, "green", "🎉"),
+    (60, "blue", "👍"),
+    (40, "orange", "📚"),
+    (float("-inf"), "red", "💪")
+)
+
+
+# Score distribution buckets: (count key, chart label)
+SCORE_DISTRIBUTION = (
+    ("excellent_count", "🎉 Excellent (80+)"),
+    ("good_count", "👍 Good (60-79)"),
+    ("fair_count", "📚 Fair (40-59)"),
+    ("poor_count", "💪 Needs Work (<40)")
+)
+
+
+def render_score_distribution(counts: dict, height: int = 160):
+    """Render a session's bucket counts as a single horizontal bar chart"""
+    st.bar_chart(
+        [{"bucket": label, "words": counts[key]} for key, label in SCORE_DISTRIBUTION],
+        x="bucket",
+        y="words",
+        horizontal=True,
+        height=height
+    )
+
+
+def score_style(score: float) -> tuple:
+    """Color and emoji for a score"""
+    return next((color, emoji) for threshold, color, emoji in SCORE_BUCKETS if score >= threshold)
+
+
 # Page configuration
 st.set_page_config(
     page_title="Speaking Buddy",
@@ -19,6 +69,129 @@ st.set_page_config(
 )
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_dashboard_bundle(user_id: int, version: int) -> dict:
+    """Dashboard stats, recent sessions and category stats, cached briefly"""
+    return database.get_dashboard_bundle(user_id, session_limit=5)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_user_sessions(user_id: int, limit: int, version: int) -> list:
+    """Recent completed sessions, cached briefly so reruns don't re-query SQLite"""
+    return database.get_user_sessions(user_id, limit=limit)
+
+
+@st.cache_data(show_spinner=False)
+def _grouped_session_attempts(session_id: int) -> dict:
+    """
+    A session's attempts grouped by word. A completed session no longer
+    changes, so this is cached without a TTL.
+    """
+    session = database.get_session_details(session_id)
+
+    words_data = {}
+    for attempt in session.get('attempts', []):
+        word = attempt['word']
+        if word not in words_data:
+            words_data[word] = {
+                'translation': attempt['translation'],
+                'category': attempt['category'],
+                'attempts': []
+            }
+        words_data[word]['attempts'].append(attempt)
+    return words_data
+
+
+@lru_cache(maxsize=None)
+def _get_praat():
+    """
+    Import the Praat comparison on first use. It pulls in parselmouth, numpy,
+    scipy and librosa, which the login and dashboard pages don't need.
+    """
+    from src.praat_analyzer import sound_from_pcm
+    from src.pronunciation_checker import compare_pronunciations_praat_from_sound
+    return sound_from_pcm, compare_pronunciations_praat_from_sound
+
+
+def _compare_recording(reference_path: str, recording, previous_score) -> tuple:
+    """
+    Praat comparison of an in-memory recording against a reference. Runs on
+    the background executor, so it must not touch Streamlit state.
+    """
+    sound_from_pcm, compare = _get_praat()
+    user_sound = sound_from_pcm(recording.raw_data, recording.sample_width,
+                                recording.channels, recording.frame_rate)
+    return compare(reference_path, user_sound, previous_score)
+
+
+@st.cache_resource
+def _comparison_cache() -> tuple:
+    """
+    LRU of comparison results shared by all sessions, with its lock. Keyed
+    by (reference path, recording hash, previous score); recordings are
+    content-addressed, so equal keys mean equal inputs.
+    """
+    return OrderedDict(), threading.Lock()
+
+
+def cached_comparison(key: tuple):
+    """Return the cached comparison result for key, or None"""
+    cache, lock = _comparison_cache()
+    with lock:
+        if key not in cache:
+            return None
+        cache.move_to_end(key)
+        return cache[key]
+
+
+def remember_comparison(key: tuple, result: tuple):
+    """Cache a comparison result, evicting the least recently used"""
+    cache, lock = _comparison_cache()
+    with lock:
+        cache[key] = result
+        cache.move_to_end(key)
+        if len(cache) > COMPARE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def _reference_bytes(word: str) -> tuple:
+    """Reference audio bytes and path for a word, downloaded and read once"""
+    from src.reference_manager import ensure_reference_exists
+    path = ensure_reference_exists(word)
+    return path.read_bytes(), str(path)
+
+
+def prefetch_next_reference(session_mgr: SessionManager):
+    """Download the next word's reference audio in the background"""
+    next_word = session_mgr.peek_next_word()
+    if next_word is not None:
+        from src.reference_manager import ensure_reference_exists
+        # Failures are ignored here; the practice page reports them
+        st.session_state.executor.submit(ensure_reference_exists, next_word)
+
+
+@st.cache_resource
+def _progress_versions() -> dict:
+    """
+    Per-user counters passed to the cached progress reads. Bumping a user's
+    counter makes their next reads miss the cache, leaving other users'
+    entries in place.
+    """
+    return {}
+
+
+def progress_version(user_id: int) -> int:
+    """Current cache version of a user's progress reads"""
+    return _progress_versions().get(user_id, 0)
+
+
+def invalidate_progress_cache(user_id: int):
+    """Make the user's cached progress reads stale after their progress was written"""
+    versions = _progress_versions()
+    versions[user_id] = versions.get(user_id, 0) + 1
+
+
 def initialize_session_state():
     """Initialize session state variables"""
     # Authentication state
@@ -29,16 +202,19 @@ def initialize_session_state():
     if 'show_page' not in st.session_state:
         st.session_state.show_page = 'login'  # 'login', 'signup', 'dashboard', 'practice', 'history'
 
-    # Session manager - only if logged in
-    if st.session_state.logged_in and 'session_manager' not in st.session_state:
-        user_id = st.session_state.user['id'] if st.session_state.user else None
-        st.session_state.session_manager = SessionManager(user_id=user_id)
+    # Session manager - created on the practice page by ensure_session_manager
+    if 'start_new_session' not in st.session_state:
+        st.session_state.start_new_session = False
 
     # Recording state
     if 'user_audio_bytes' not in st.session_state:
         st.session_state.user_audio_bytes = None
+    if 'user_audio_fp' not in st.session_state:
+        st.session_state.user_audio_fp = None
     if 'user_audio_path' not in st.session_state:
         st.session_state.user_audio_path = None
+    if 'user_audio_ready' not in st.session_state:
+        st.session_state.user_audio_ready = False
     if 'comparison_done' not in st.session_state:
         st.session_state.comparison_done = False
     if 'score' not in st.session_state:
@@ -48,18 +224,41 @@ def initialize_session_state():
     if 'insights' not in st.session_state:
         st.session_state.insights = None
 
+    # Pronunciation analysis runs in the background: (word, cache key, future) while pending
+    if 'executor' not in st.session_state:
+        st.session_state.executor = ThreadPoolExecutor(max_workers=2)
+    if 'compare_future' not in st.session_state:
+        st.session_state.compare_future = None
+
+
+def ensure_session_manager():
+    """
+    Keep the current practice session across page switches; only build a
+    new SessionManager when there is none or a new session was requested
+    """
+    if st.session_state.start_new_session or 'session_manager' not in st.session_state:
+        st.session_state.session_manager = SessionManager(user_id=st.session_state.user['id'])
+        st.session_state.start_new_session = False
+
 
 def logout():
     """Log out user and clear session"""
     st.session_state.logged_in = False
     st.session_state.user = None
     st.session_state.show_page = 'login'
-    # Clear session manager
+    # Clear session manager and stop background analysis
     if 'session_manager' in st.session_state:
         del st.session_state.session_manager
+    st.session_state.start_new_session = False
+    if 'executor' in st.session_state:
+        st.session_state.executor.shutdown(wait=False)
+        del st.session_state.executor
+    st.session_state.compare_future = None
     # Clear recording state
     st.session_state.user_audio_bytes = None
+    st.session_state.user_audio_fp = None
     st.session_state.user_audio_path = None
+    st.session_state.user_audio_ready = False
     st.session_state.comparison_done = False
 
 
@@ -159,9 +358,9 @@ def render_user_menu():
 
         if st.button("🗣️ Practice Session", use_container_width=True):
             st.session_state.show_page = 'practice'
-            # Create new session manager if needed
-            if 'session_manager' not in st.session_state or st.session_state.session_manager.is_session_complete():
-                st.session_state.session_manager = SessionManager(user_id=st.session_state.user['id'])
+            # Resume the current session; start a new one if it is finished
+            if 'session_manager' in st.session_state and st.session_state.session_manager.is_session_complete():
+                st.session_state.start_new_session = True
             st.rerun()
 
         if st.button("📚 Session History", use_container_width=True):
@@ -179,8 +378,10 @@ def render_dashboard():
     """Render user dashboard with statistics"""
     st.title("📊 Your Dashboard")
 
-    # Get user stats
-    user_stats = database.get_user_stats(st.session_state.user['id'])
+    # Get user stats, recent sessions and category stats in one read
+    user_id = st.session_state.user['id']
+    bundle = _cached_dashboard_bundle(user_id, progress_version(user_id))
+    user_stats = bundle['stats']
 
     # Overall statistics
     col1, col2, col3, col4 = st.columns(4)
@@ -197,7 +398,7 @@ def render_dashboard():
 
     # Recent sessions
     st.subheader("📈 Recent Sessions")
-    recent_sessions = database.get_user_sessions(st.session_state.user['id'], limit=5)
+    recent_sessions = bundle['recent']
 
     if recent_sessions:
         for session in recent_sessions:
@@ -214,15 +415,7 @@ def render_dashboard():
 
                 # Score distribution
                 st.write("**Performance:**")
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.write(f"🎉 {session['excellent_count']}")
-                with col2:
-                    st.write(f"👍 {session['good_count']}")
-                with col3:
-                    st.write(f"📚 {session['fair_count']}")
-                with col4:
-                    st.write(f"💪 {session['poor_count']}")
+                render_score_distribution(session)
     else:
         st.info("No sessions completed yet. Start practicing to see your progress!")
 
@@ -230,7 +423,7 @@ def render_dashboard():
 
     # Category performance
     st.subheader("🎯 Performance by Category")
-    category_stats = database.get_category_stats(st.session_state.user['id'])
+    category_stats = bundle['categories']
 
     if category_stats:
         for category, stats in category_stats.items():
@@ -252,7 +445,7 @@ def render_dashboard():
     with col1:
         if st.button("🗣️ Start New Practice Session", use_container_width=True, type="primary"):
             st.session_state.show_page = 'practice'
-            st.session_state.session_manager = SessionManager(user_id=st.session_state.user['id'])
+            st.session_state.start_new_session = True
             st.rerun()
     with col2:
         if st.button("📚 View All Sessions", use_container_width=True):
@@ -260,18 +453,32 @@ def render_dashboard():
             st.rerun()
 
 
+# Session history table columns, in display order
+HISTORY_COLUMNS = {
+    'completed_at': st.column_config.TextColumn("Completed"),
+    'overall_score': st.column_config.ProgressColumn("Overall Score", format="%.1f", min_value=0, max_value=100),
+    'total_words': st.column_config.NumberColumn("Words"),
+    'total_attempts': st.column_config.NumberColumn("Attempts"),
+    'average_score': st.column_config.NumberColumn("Average", format="%.1f"),
+    'excellent_count': st.column_config.NumberColumn("🎉 Excellent"),
+    'good_count': st.column_config.NumberColumn("👍 Good"),
+    'fair_count': st.column_config.NumberColumn("📚 Fair"),
+    'poor_count': st.column_config.NumberColumn("💪 Needs Work")
+}
+
+
 def render_session_history():
     """Render session history page"""
     st.title("📚 Session History")
 
     # Get all sessions
-    sessions = database.get_user_sessions(st.session_state.user['id'], limit=20)
+    user_id = st.session_state.user['id']
+    sessions = _cached_user_sessions(user_id, limit=20, version=progress_version(user_id))
 
     if not sessions:
         st.info("No session history yet. Complete your first practice session!")
         if st.button("🗣️ Start Practicing", use_container_width=True, type="primary"):
             st.session_state.show_page = 'practice'
-            st.session_state.session_manager = SessionManager(user_id=st.session_state.user['id'])
             st.rerun()
         return
 
@@ -281,38 +488,29 @@ def render_session_history():
 
     st.divider()
 
-    # Display sessions
-    for i, session in enumerate(sessions[:show_count], 1):
-        with st.expander(
-            f"#{i} - {session['completed_at'][:16]} | Score: {session['overall_score']:.1f}/100 | {session['total_words']} words"
-        ):
-            # Basic stats
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Overall Score", f"{session['overall_score']:.1f}/100")
-            with col2:
-                st.metric("Words", session['total_words'])
-            with col3:
-                st.metric("Attempts", session['total_attempts'])
-            with col4:
-                st.metric("Average", f"{session['average_score']:.1f}/100")
-
-            # Performance breakdown
-            st.write("**Score Distribution:**")
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.write(f"🎉 Excellent: {session['excellent_count']}")
-            with col2:
-                st.write(f"👍 Good: {session['good_count']}")
-            with col3:
-                st.write(f"📚 Fair: {session['fair_count']}")
-            with col4:
-                st.write(f"💪 Needs Work: {session['poor_count']}")
-
-            # Detailed view button
-            if st.button(f"View Detailed Results", key=f"detail_{session['id']}"):
-                st.session_state.show_session_detail = session['id']
-                st.rerun()
+    # Display sessions as one table rather than a set of widgets per session
+    shown = sessions[:show_count]
+    st.dataframe(
+        shown,
+        column_order=list(HISTORY_COLUMNS),
+        column_config=HISTORY_COLUMNS,
+        hide_index=True,
+        use_container_width=True
+    )
+
+    # Detailed view
+    labels = {
+        session['id']: f"#{i} - {session['completed_at'][:16]} | Score: {session['overall_score']:.1f}/100"
+        for i, session in enumerate(shown, 1)
+    }
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected = st.selectbox("Session", list(labels), format_func=labels.get,
+                                label_visibility="collapsed")
+    with col2:
+        if st.button("View Detailed Results", use_container_width=True):
+            st.session_state.show_session_detail = selected
+            st.rerun()
 
     # Show session detail if requested
     if 'show_session_detail' in st.session_state and st.session_state.show_session_detail:
@@ -321,23 +519,11 @@ def render_session_history():
 
 def show_session_detail(session_id: int):
     """Show detailed session results"""
-    session = database.get_session_details(session_id)
+    words_data = _grouped_session_attempts(session_id)
 
     st.divider()
     st.subheader(f"📋 Detailed Results - Session {session_id}")
 
-    # Group attempts by word
-    words_data = {}
-    for attempt in session['attempts']:
-        word = attempt['word']
-        if word not in words_data:
-            words_data[word] = {
-                'translation': attempt['translation'],
-                'category': attempt['category'],
-                'attempts': []
-            }
-        words_data[word]['attempts'].append(attempt)
-
     # Display each word
     for word, data in words_data.items():
         best_score = max(att['score'] for att in data['attempts'])
@@ -360,8 +546,12 @@ def show_session_detail(session_id: int):
 def reset_recording():
     """Reset the recording and comparison state for new attempt"""
     st.session_state.user_audio_bytes = None
+    st.session_state.user_audio_fp = None
     st.session_state.user_audio_path = None
+    st.session_state.user_audio_ready = False
     st.session_state.comparison_done = False
+    # Drop the result of any analysis still running for the old recording
+    st.session_state.compare_future = None
 
 
 def move_to_next_word():
@@ -377,7 +567,12 @@ def render_final_summary():
     """Render the final session summary page"""
     st.title("🎉 Session Complete!")
 
-    summary = st.session_state.session_manager.get_session_summary()
+    session_mgr = st.session_state.session_manager
+    # The first summary of a session marks it complete in the database
+    just_completed = not session_mgr.summary_ready
+    summary = session_mgr.get_session_summary()
+    if just_completed:
+        invalidate_progress_cache(st.session_state.user['id'])
 
     # Overall performance
     st.markdown("## 📊 Overall Performance")
@@ -396,15 +591,7 @@ def render_final_summary():
 
     # Score distribution
     st.markdown("## 📈 Score Distribution")
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("🎉 Excellent (80+)", summary['excellent_count'])
-    with col2:
-        st.metric("👍 Good (60-79)", summary['good_count'])
-    with col3:
-        st.metric("📚 Fair (40-59)", summary['fair_count'])
-    with col4:
-        st.metric("💪 Needs Work (<40)", summary['poor_count'])
+    render_score_distribution(summary, height=200)
 
     st.divider()
 
@@ -422,18 +609,14 @@ def render_final_summary():
                     st.write(f"**{word}** ({data['translation']})")
                 with col2:
                     score = data['best_score']
-                    color = "green" if score >= 80 else "blue" if score >= 60 else "orange" if score >= 40 else "red"
+                    color, _ = score_style(score)
                     st.markdown(f"<span style='color: {color};'>{score:.1f}/100</span>", unsafe_allow_html=True)
 
     st.divider()
 
     # Top performers
     st.markdown("## 🏆 Top Performers")
-    word_scores = [(word, data['best_score'], data['translation'])
-                   for word, data in summary['word_results'].items()]
-    top_words = sorted(word_scores, key=lambda x: x[1], reverse=True)[:5]
-
-    for i, (word, score, translation) in enumerate(top_words, 1):
+    for i, (word, score, translation) in enumerate(summary['top_words'], 1):
         emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "⭐"
         st.write(f"{emoji} **{word}** ({translation}): {score:.1f}/100")
 
@@ -443,7 +626,7 @@ def render_final_summary():
     col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("🔄 Start New Session", use_container_width=True, type="primary"):
-            st.session_state.session_manager = SessionManager(user_id=st.session_state.user['id'])
+            st.session_state.start_new_session = True
             st.session_state.show_page = 'practice'
             reset_recording()
             st.rerun()
@@ -461,86 +644,55 @@ def render_final_summary():
             st.rerun()
 
 
-def render_practice_word():
-    """Render the practice interface for current word"""
+@st.fragment
+def _record_and_analyze(current_word: str, reference_path: str):
+    """
+    Recording, analysis and results for the current word. As a fragment,
+    its widgets rerun only this section, not the word header or the
+    reference audio above it.
+    """
     session_mgr = st.session_state.session_manager
-    current_word_info = session_mgr.get_current_word_info()
-
-    if current_word_info is None:
-        return
-
-    current_word = current_word_info['word']
-
-    # Title and progress
-    st.title("🗣️ Speaking Buddy")
-    st.subheader("Pronunciation Practice")
-
-    # Progress bar
-    progress = session_mgr.get_progress()
-    st.progress(progress['percentage'] / 100)
-    st.write(f"**Progress:** Word {progress['current_index'] + 1} of {progress['total_words']}")
-
-    st.divider()
-
-    # Current word display
-    st.markdown(f"### Practice Word: **{current_word}**")
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        st.caption(f"English: {current_word_info['translation']}")
-    with col2:
-        st.caption(f"Category: {current_word_info['category']}")
-
-    # Attempt counter
-    attempts = current_word_info['attempts_so_far']
-    st.write(f"**Attempts:** {attempts}/{MAX_ATTEMPTS_PER_WORD}")
-
-    st.divider()
-
-    # Reference audio section
-    st.markdown("### 📻 Reference Pronunciation")
-    st.write("Listen to the correct pronunciation:")
-
-    try:
-        with st.spinner("Loading reference audio..."):
-            reference_path = ensure_reference_exists(current_word)
-
-        # Display audio player
-        with open(reference_path, 'rb') as audio_file:
-            st.audio(audio_file.read(), format='audio/wav')
-
-    except Exception as e:
-        st.error(f"Failed to load reference audio: {str(e)}")
-        st.info("Audio not available for this word yet. You can skip to the next word.")
-
-        if st.button("⏭️ Skip to Next Word"):
-            move_to_next_word()
-            st.rerun()
-        return
-
-    st.divider()
+    attempts = len(session_mgr.get_attempts_for_current_word())
 
     # Recording section
     st.markdown("### 🎤 Your Recording")
     st.write("Click the microphone to start recording. Click again to stop.")
 
     # Audio recorder
+    from audiorecorder import audiorecorder
     audio_bytes = audiorecorder("Click to record", "Recording...")
 
     # Handle new recording
     if len(audio_bytes) > 0:
-        if st.session_state.user_audio_path is None or audio_bytes != st.session_state.user_audio_bytes:
+        # Fingerprint the PCM so reruns don't compare or re-save the same recording
+        fingerprint = hashlib.blake2b(audio_bytes.raw_data, digest_size=12).hexdigest()
+        if st.session_state.user_audio_path is None or fingerprint != st.session_state.user_audio_fp:
             st.session_state.user_audio_bytes = audio_bytes
+            st.session_state.user_audio_fp = fingerprint
             st.session_state.comparison_done = False
-
-            # Save audio
-            temp_filepath = USER_RECORDINGS_DIR / f"recording_{current_word}_{id(audio_bytes)}.wav"
-            audio_bytes.export(temp_filepath, format="wav")
+            # A comparison still running belongs to the previous recording
+            st.session_state.compare_future = None
+
+            # Save audio under its content hash; identical audio is already on disk
+            temp_filepath = USER_RECORDINGS_DIR / f"{current_word}_{fingerprint}.wav"
+            if not temp_filepath.exists():
+                # The segment already holds PCM; write it behind a WAV header
+                # directly rather than through pydub's ffmpeg export
+                with wave.open(str(temp_filepath), 'wb') as wav_file:
+                    wav_file.setnchannels(audio_bytes.channels)
+                    wav_file.setsampwidth(audio_bytes.sample_width)
+                    wav_file.setframerate(audio_bytes.frame_rate)
+                    wav_file.writeframes(audio_bytes.raw_data)
             st.session_state.user_audio_path = temp_filepath
+            st.session_state.user_audio_ready = True
 
             st.success("✅ Recording saved!")
 
+            # Fetch the next word's reference while the user reviews this one
+            prefetch_next_reference(session_mgr)
+
     # Display recorded audio
-    if st.session_state.user_audio_path and st.session_state.user_audio_path.exists():
+    if st.session_state.user_audio_ready:
         st.write("Your recording:")
         st.audio(str(st.session_state.user_audio_path))
 
@@ -550,37 +702,64 @@ def render_practice_word():
         col1, col2 = st.columns([1, 1])
 
         with col1:
-            if st.button("🔍 Compare Pronunciation", type="primary", use_container_width=True):
-                with st.spinner("Analyzing your pronunciation..."):
-                    try:
-                        # Get previous attempts for trend analysis
-                        previous_attempts = session_mgr.get_attempts_for_current_word()
-                        previous_score = previous_attempts[-1]["score"] if previous_attempts else None
-
-                        # Compare pronunciations
-                        score, feedback, insights = compare_pronunciations_praat(
-                            reference_path,
-                            st.session_state.user_audio_path,
-                            previous_score
-                        )
-
-                        # Store results
-                        st.session_state.score = score
-                        st.session_state.feedback = feedback
-                        st.session_state.insights = insights
-                        st.session_state.comparison_done = True
-
-                        # Record in session manager (will save to database)
-                        session_mgr.record_attempt(current_word, score, feedback, insights)
-
-                    except Exception as e:
-                        st.error(f"Comparison failed: {str(e)}")
+            if st.button("🔍 Compare Pronunciation", type="primary", use_container_width=True,
+                         disabled=st.session_state.compare_future is not None):
+                # Get previous attempts for trend analysis
+                previous_attempts = session_mgr.get_attempts_for_current_word()
+                previous_score = previous_attempts[-1]["score"] if previous_attempts else None
+
+                # Compare pronunciations off the script thread, so the page
+                # stays responsive while Praat runs
+                key = (reference_path, st.session_state.user_audio_fp, previous_score)
+                cached = cached_comparison(key)
+                if cached is not None:
+                    future = Future()
+                    future.set_result(cached)
+                else:
+                    future = st.session_state.executor.submit(
+                        _compare_recording,
+                        reference_path,
+                        st.session_state.user_audio_bytes,
+                        previous_score
+                    )
+                st.session_state.compare_future = (current_word, key, future)
+                # Full rerun so the page-level poller starts
+                st.rerun()
 
         with col2:
             if st.button("🔄 Try Again", use_container_width=True):
                 reset_recording()
                 st.rerun()
 
+        # Record a finished comparison; _await_comparison polls a running one
+        pending = st.session_state.compare_future
+        if pending is not None and pending[-1].done():
+            compared_word, key, future = pending
+            st.session_state.compare_future = None
+            # Results for a recording the user has since replaced are discarded
+            is_current = compared_word == current_word and key[1] == st.session_state.user_audio_fp
+            try:
+                score, feedback, insights = future.result()
+                remember_comparison(key, (score, feedback, insights))
+
+                if is_current:
+                    # Store results
+                    st.session_state.score = score
+                    st.session_state.feedback = feedback
+                    st.session_state.insights = insights
+                    st.session_state.comparison_done = True
+
+                    # Record in session manager (will save to database)
+                    session_mgr.record_attempt(compared_word, score, feedback, insights)
+
+            except Exception as e:
+                if is_current:
+                    st.error(f"Comparison failed: {str(e)}")
+            else:
+                if is_current:
+                    # Refresh the whole page so the attempt counter is updated
+                    st.rerun()
+
         # Display results
         if st.session_state.comparison_done and st.session_state.score is not None:
             st.divider()
@@ -590,14 +769,7 @@ def render_practice_word():
             insights = st.session_state.insights
 
             # Score display
-            if score >= 80:
-                color, emoji = "green", "🎉"
-            elif score >= 60:
-                color, emoji = "blue", "👍"
-            elif score >= 40:
-                color, emoji = "orange", "📚"
-            else:
-                color, emoji = "red", "💪"
+            color, emoji = score_style(score)
 
             st.markdown(
                 f"<h1 style='text-align: center; color: {color};'>{emoji} {score:.1f}/100</h1>",
@@ -624,15 +796,7 @@ def render_practice_word():
                 st.markdown("**🎯 Phonetic Feature Scores:**")
 
                 breakdown = insights["breakdown"]
-                feature_labels = {
-                    "pitch": "🎵 Intonation",
-                    "formants": "🗣️ Vowel Quality",
-                    "intensity": "💪 Stress Patterns",
-                    "duration": "⏱️ Timing/Rhythm",
-                    "voice_quality": "✨ Voice Clarity"
-                }
-
-                for feature, label in feature_labels.items():
+                for feature, label in FEATURE_LABELS.items():
                     if feature in breakdown:
                         feature_score = breakdown[feature]
                         st.markdown(f"{label}: {feature_score:.1f}/100")
@@ -677,6 +841,82 @@ def render_practice_word():
     else:
         st.info("👆 Record your pronunciation to get started!")
 
+
+
+@st.fragment(run_every=COMPARE_POLL_INTERVAL)
+def _await_comparison():
+    """
+    Show progress while the pronunciation analysis runs. Only this fragment
+    reruns while waiting; once the analysis is done the whole page reruns
+    and _record_and_analyze records the result.
+    """
+    pending = st.session_state.compare_future
+    if pending is None or pending[-1].done():
+        st.rerun()
+    st.info("⏳ Analyzing your pronunciation...")
+
+
+def render_practice_word():
+    """Render the practice interface for current word"""
+    session_mgr = st.session_state.session_manager
+    current_word_info = session_mgr.get_current_word_info()
+
+    if current_word_info is None:
+        return
+
+    current_word = current_word_info['word']
+
+    # Title and progress
+    st.title("🗣️ Speaking Buddy")
+    st.subheader("Pronunciation Practice")
+
+    # Progress bar
+    progress = session_mgr.get_progress()
+    st.progress(progress['percentage'] / 100)
+    st.write(f"**Progress:** Word {progress['current_index'] + 1} of {progress['total_words']}")
+
+    st.divider()
+
+    # Current word display
+    st.markdown(f"### Practice Word: **{current_word}**")
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.caption(f"English: {current_word_info['translation']}")
+    with col2:
+        st.caption(f"Category: {current_word_info['category']}")
+
+    # Attempt counter
+    attempts = current_word_info['attempts_so_far']
+    st.write(f"**Attempts:** {attempts}/{MAX_ATTEMPTS_PER_WORD}")
+
+    st.divider()
+
+    # Reference audio section
+    st.markdown("### 📻 Reference Pronunciation")
+    st.write("Listen to the correct pronunciation:")
+
+    try:
+        with st.spinner("Loading reference audio..."):
+            reference_bytes, reference_path = _reference_bytes(current_word)
+
+        # Display audio player
+        st.audio(reference_bytes, format='audio/wav')
+
+    except Exception as e:
+        st.error(f"Failed to load reference audio: {str(e)}")
+        st.info("Audio not available for this word yet. You can skip to the next word.")
+
+        if st.button("⏭️ Skip to Next Word"):
+            move_to_next_word()
+            st.rerun()
+        return
+
+    st.divider()
+
+    _record_and_analyze(current_word, reference_path)
+    if st.session_state.compare_future is not None:
+        _await_comparison()
+
     # Footer
     st.divider()
     st.caption("Powered by Praat phonetic analysis | Progress saved automatically")
@@ -701,8 +941,9 @@ def main():
         elif st.session_state.show_page == 'history':
             render_session_history()
         elif st.session_state.show_page == 'practice':
+            ensure_session_manager()
             # Check if session is complete
-            if 'session_manager' in st.session_state and st.session_state.session_manager.is_session_complete():
+            if st.session_state.session_manager.is_session_complete():
                 render_final_summary()
             else:
                 render_practice_word()
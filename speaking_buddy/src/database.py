@@ -305,26 +305,29 @@ def update_user_stats(cursor, user_id: int):
     )
 
 
-def get_user_stats(user_id: int) -> Dict[str, Any]:
-    """Get user statistics"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
+def fetch_user_stats(cursor, user_id: int) -> Dict[str, Any]:
+    """Read user statistics with an open cursor"""
     cursor.execute("SELECT * FROM user_stats WHERE user_id = ?", (user_id,))
     stats_row = cursor.fetchone()
 
-    conn.close()
-
     if stats_row:
         return dict(stats_row)
     return {}
 
 
-def get_user_sessions(user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-    """Get user's recent sessions"""
+def get_user_stats(user_id: int) -> Dict[str, Any]:
+    """Get user statistics"""
     conn = get_connection()
     cursor = conn.cursor()
 
+    stats = fetch_user_stats(cursor, user_id)
+
+    conn.close()
+    return stats
+
+
+def fetch_user_sessions(cursor, user_id: int, limit: int) -> List[Dict[str, Any]]:
+    """Read a user's recent completed sessions with an open cursor"""
     cursor.execute(
         """
         SELECT * FROM sessions
@@ -335,9 +338,17 @@ def get_user_sessions(user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         (user_id, limit)
     )
 
-    sessions = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def get_user_sessions(user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    """Get user's recent sessions"""
+    conn = get_connection()
+    cursor = conn.cursor()
 
+    sessions = fetch_user_sessions(cursor, user_id, limit)
+
+    conn.close()
     return sessions
 
 
@@ -403,11 +414,8 @@ def get_word_history(user_id: int, word: str) -> List[Dict[str, Any]]:
     return history
 
 
-def get_category_stats(user_id: int) -> Dict[str, Dict[str, Any]]:
-    """Get user's performance statistics by category"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
+def fetch_category_stats(cursor, user_id: int) -> Dict[str, Dict[str, Any]]:
+    """Read a user's performance statistics by category with an open cursor"""
     cursor.execute(
         """
         SELECT
@@ -430,9 +438,42 @@ def get_category_stats(user_id: int) -> Dict[str, Dict[str, Any]]:
         category = row['category']
         category_stats[category] = dict(row)
 
+    return category_stats
+
+
+def get_category_stats(user_id: int) -> Dict[str, Dict[str, Any]]:
+    """Get user's performance statistics by category"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    category_stats = fetch_category_stats(cursor, user_id)
+
     conn.close()
     return category_stats
 
 
+def get_dashboard_bundle(user_id: int, session_limit: int = 5) -> Dict[str, Any]:
+    """
+    Get everything the dashboard shows with one connection and one read
+    transaction, so the three reads see the same snapshot.
+
+    Returns:
+        Dict with 'stats', 'recent' (sessions) and 'categories'
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("BEGIN")
+    bundle = {
+        'stats': fetch_user_stats(cursor, user_id),
+        'recent': fetch_user_sessions(cursor, user_id, session_limit),
+        'categories': fetch_category_stats(cursor, user_id)
+    }
+    conn.commit()
+
+    conn.close()
+    return bundle
+
+
 # Initialize database on module import
 init_database()
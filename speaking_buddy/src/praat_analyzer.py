@@ -27,6 +27,47 @@ def load_sound(audio_path: Path) -> parselmouth.Sound:
     return parselmouth.Sound(str(audio_path))
 
 
+def _pcm_samples(raw_data: bytes, sample_width: int) -> np.ndarray:
+    """Decode little-endian PCM bytes as float samples in [-1, 1]"""
+    if sample_width == 1:
+        # 8-bit WAV PCM is unsigned, centered on 128
+        samples = np.frombuffer(raw_data, dtype=np.uint8).astype(np.float64) - 128
+    elif sample_width == 3:
+        # numpy has no 24-bit dtype; assemble each sample and sign-extend it
+        octets = np.frombuffer(raw_data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = octets[:, 0] | (octets[:, 1] << 8) | (octets[:, 2] << 16)
+        samples = ((ints ^ 0x800000) - 0x800000).astype(np.float64)
+    elif sample_width in (2, 4):
+        samples = np.frombuffer(raw_data, dtype=f"<i{sample_width}").astype(np.float64)
+    else:
+        raise ValueError(f"Unsupported PCM sample width: {sample_width}")
+    return samples / float(2 ** (8 * sample_width - 1))
+
+
+def sound_from_pcm(raw_data: bytes, sample_width: int, channels: int, frame_rate: int) -> parselmouth.Sound:
+    """
+    Build a Parselmouth Sound from interleaved little-endian PCM samples,
+    without writing and re-reading a WAV file.
+
+    Args:
+        raw_data: PCM sample bytes as in a WAV file (e.g. AudioSegment.raw_data):
+            unsigned for 1-byte samples, signed otherwise
+        sample_width: Bytes per sample (1 to 4)
+        channels: Number of interleaved channels
+        frame_rate: Sampling frequency in Hz
+
+    Returns:
+        Parselmouth Sound object with samples scaled to [-1, 1]
+
+    Raises:
+        ValueError: If sample_width is not 1, 2, 3 or 4
+    """
+    samples = _pcm_samples(raw_data, sample_width)
+    # Parselmouth expects one row per channel
+    samples = samples.reshape(-1, channels).T
+    return parselmouth.Sound(samples, sampling_frequency=frame_rate)
+
+
 def extract_pitch_features(sound: parselmouth.Sound) -> Dict[str, Any]:
     """
     Extract pitch (F0) related features for intonation analysis.
@@ -254,8 +295,19 @@ def extract_all_praat_features(audio_path: Path) -> Dict[str, Any]:
     Returns:
         Dictionary with all extracted features
     """
-    sound = load_sound(audio_path)
+    return extract_sound_features(load_sound(audio_path))
 
+
+def extract_sound_features(sound: parselmouth.Sound) -> Dict[str, Any]:
+    """
+    Extract all Praat-based phonetic features from a loaded sound.
+
+    Args:
+        sound: Parselmouth Sound object
+
+    Returns:
+        Dictionary with all extracted features
+    """
     return {
         "pitch": extract_pitch_features(sound),
         "formants": extract_formant_features(sound),
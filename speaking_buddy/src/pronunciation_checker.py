@@ -6,7 +6,7 @@ from scipy.ndimage import uniform_filter1d
 from typing import Tuple, Dict, Any
 from .audio_processor import preprocess_audio, extract_mfcc
 from .config import SCORE_THRESHOLDS, FEEDBACK_MESSAGES
-from .praat_analyzer import extract_all_praat_features
+from .praat_analyzer import extract_all_praat_features, extract_sound_features, load_sound
 from .feature_comparator import calculate_weighted_score
 from .feedback_generator import generate_phonetic_feedback
 
@@ -275,9 +275,29 @@ def compare_pronunciations_praat(
     Raises:
         Exception: If audio processing or Praat analysis fails
     """
-    # Extract Praat phonetic features from both audio files
+    return compare_pronunciations_praat_from_sound(reference_path, load_sound(user_path), previous_score)
+
+
+def compare_pronunciations_praat_from_sound(
+    reference_path: Path,
+    user_sound,
+    previous_score: float = None
+) -> Tuple[float, str, Dict[str, Any]]:
+    """
+    Compare a user recording that is already in memory against a reference.
+    Same as compare_pronunciations_praat, without reading the user's WAV file.
+
+    Args:
+        reference_path: Path to reference audio file
+        user_sound: Parselmouth Sound of the user's recording
+        previous_score: Previous attempt score for trend analysis (optional)
+
+    Returns:
+        Tuple of (similarity score 0-100, feedback message, detailed insights dict)
+    """
+    # Extract Praat phonetic features from both recordings
     ref_features = extract_all_praat_features(reference_path)
-    user_features = extract_all_praat_features(user_path)
+    user_features = extract_sound_features(user_sound)
 
     # Calculate weighted score with feature breakdown
     scores = calculate_weighted_score(ref_features, user_features)
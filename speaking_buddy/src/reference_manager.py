@@ -1,11 +1,32 @@
 """Reference audio download and caching manager"""
+import os
+import tempfile
 import requests
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 from pydub import AudioSegment
 from .config import REFERENCE_AUDIO_DIR, REFERENCE_URLS
 
 
+def write_atomically(path: Path, write: Callable[[str], None]):
+    """
+    Write a file through a temporary file in the same directory, then move it
+    into place, so concurrent readers never see a partially written file.
+
+    Args:
+        path: Final path of the file
+        write: Called with the temporary path to write the content to
+    """
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=f"{path.suffix}.tmp")
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
 def download_reference_audio(word: str, url: str) -> Path:
     """
     Download reference audio from URL, convert to WAV, and save to cache directory.
@@ -30,12 +51,11 @@ def download_reference_audio(word: str, url: str) -> Path:
     response.raise_for_status()
 
     # Save OGG to temporary file
-    with open(ogg_filepath, 'wb') as f:
-        f.write(response.content)
+    write_atomically(ogg_filepath, lambda path: Path(path).write_bytes(response.content))
 
     # Convert OGG to WAV for Parselmouth compatibility
     audio = AudioSegment.from_ogg(ogg_filepath)
-    audio.export(wav_filepath, format="wav")
+    write_atomically(wav_filepath, lambda path: audio.export(path, format="wav").close())
 
     # Clean up OGG file (optional - keep both for now)
     # ogg_filepath.unlink()
@@ -63,7 +83,7 @@ def get_reference_audio_path(word: str) -> Optional[Path]:
     if ogg_filepath.exists():
         # Convert existing OGG to WAV
         audio = AudioSegment.from_ogg(ogg_filepath)
-        audio.export(wav_filepath, format="wav")
+        write_atomically(wav_filepath, lambda path: audio.export(path, format="wav").close())
         return wav_filepath
 
     return None
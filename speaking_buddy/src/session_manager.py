@@ -1,9 +1,21 @@
 """Session management for multi-word pronunciation practice"""
+import heapq
 import random
 from typing import List, Dict, Any, Optional
 from .config import WORD_BANK, WORDS_PER_SESSION, MAX_ATTEMPTS_PER_WORD
 from . import database
 
+# (minimum best score, summary count key), from the highest bucket down
+SCORE_BUCKETS = (
+    (80, "excellent_count"),
+    (60, "good_count"),
+    (40, "fair_count"),
+    (float("-inf"), "poor_count")
+)
+
+# Number of best-scoring words listed in the session summary
+TOP_WORDS_COUNT = 5
+
 
 class SessionManager:
     """Manages a practice session with multiple words"""
@@ -36,6 +48,9 @@ class SessionManager:
         # Current word index
         self.current_word_index = 0
 
+        # Summary of the completed session, computed once
+        self._summary: Optional[Dict[str, Any]] = None
+
         # Session results: {word: {"attempts": [...], "best_score": float}}
         self.results: Dict[str, Dict[str, Any]] = {}
 
@@ -54,6 +69,13 @@ class SessionManager:
             return None
         return self.word_list[self.current_word_index]
 
+    def peek_next_word(self) -> Optional[str]:
+        """Get the word after the current one, if any"""
+        next_index = self.current_word_index + 1
+        if next_index >= len(self.word_list):
+            return None
+        return self.word_list[next_index]
+
     def get_current_word_info(self) -> Optional[Dict[str, Any]]:
         """Get information about the current word"""
         current_word = self.get_current_word()
@@ -122,10 +144,18 @@ class SessionManager:
             "percentage": (self.current_word_index / len(self.word_list)) * 100 if self.word_list else 0
         }
 
+    @property
+    def summary_ready(self) -> bool:
+        """Whether the session summary was already computed and saved"""
+        return self._summary is not None
+
     def get_session_summary(self) -> Dict[str, Any]:
         """Get comprehensive session summary with statistics"""
         if not self.is_session_complete():
             return {"complete": False}
+        # A completed session no longer changes; summarize and save it once
+        if self._summary is not None:
+            return self._summary
 
         # Calculate statistics
         total_attempts = sum(len(data["attempts"]) for data in self.results.values())
@@ -136,6 +166,10 @@ class SessionManager:
         ]
 
         best_scores = [data["best_score"] for data in self.results.values()]
+        # Excellent, good, fair and poor counts in one pass
+        bucket_counts = dict.fromkeys((key for _, key in SCORE_BUCKETS), 0)
+        for score in best_scores:
+            bucket_counts[next(key for threshold, key in SCORE_BUCKETS if score >= threshold)] += 1
 
         # Category performance
         category_stats = {}
@@ -161,18 +195,22 @@ class SessionManager:
             "average_score": sum(all_scores) / len(all_scores) if all_scores else 0,
             "best_score": max(best_scores) if best_scores else 0,
             "worst_score": min(best_scores) if best_scores else 0,
-            "excellent_count": sum(1 for score in best_scores if score >= 80),
-            "good_count": sum(1 for score in best_scores if 60 <= score < 80),
-            "fair_count": sum(1 for score in best_scores if 40 <= score < 60),
-            "poor_count": sum(1 for score in best_scores if score < 40),
+            **bucket_counts,
             "category_performance": category_stats,
-            "word_results": self.results
+            "word_results": self.results,
+            # (word, best score, translation), best first
+            "top_words": heapq.nlargest(
+                TOP_WORDS_COUNT,
+                ((word, data["best_score"], data["translation"]) for word, data in self.results.items()),
+                key=lambda item: item[1]
+            )
         }
 
         # Save to database if user is logged in
         if self.user_id and self.db_session_id:
             database.complete_session(self.db_session_id, summary)
 
+        self._summary = summary
         return summary
 
     def get_attempts_for_current_word(self) -> List[Dict[str, Any]]: